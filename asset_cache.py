@@ -0,0 +1,119 @@
+import os
+import threading
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QImage, QPixmap
+from mainmenu import flag
+
+class AssetCache:
+    """
+    이모지, 하트, 버튼 아이콘 같은 이미지를 (경로, 크기)별로 한 번만 디코딩/스케일링해 두는 캐시
+    PNG 디코딩과 SmoothTransformation 스케일링은 preload()로 백그라운드 스레드에서 미리 QImage로 해 두고,
+    QPixmap은 GUI 스레드에서만 만들 수 있으므로 처음 요청될 때 한 번만 변환해 보관함.
+    미리 만들어 두지 않은 (경로, 크기)는 요청할 때 GUI 스레드에서 만들어 보관함.
+    """
+    def __init__(self):
+        # (경로, (width, height)) -> 스케일링한 QImage (백그라운드 스레드도 씀)
+        self.images = {}
+        # (경로, (width, height)) -> QPixmap (GUI 스레드 전용)
+        self.pixmaps = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @staticmethod
+    def _key(path, size):
+        if isinstance(size, QSize):
+            size = (size.width(), size.height())
+        return os.path.normpath(path), (int(size[0]), int(size[1]))
+
+    @staticmethod
+    def _load(path, sizes, aspect_mode=Qt.KeepAspectRatio):
+        """
+        이미지를 한 번 디코딩해 주어진 크기들로 스케일링하는 함수
+        Returns:
+            Dict: {(width, height): QImage}. 파일을 읽을 수 없으면 빈 딕셔너리
+        """
+        image = QImage(path)
+        if image.isNull():
+            return {}
+        return {size: image.scaled(QSize(*size), aspect_mode, Qt.SmoothTransformation) for size in sizes}
+
+    def preload(self, requests):
+        """
+        이미지들을 백그라운드 스레드에서 미리 디코딩/스케일링하는 함수
+        Argv:
+            requests (dict): {경로: [(width, height), ...]} 미리 만들어 둘 크기 목록
+        """
+        def run():
+            for path, sizes in requests.items():
+                keys = [self._key(path, size) for size in sizes]
+                with self.lock:
+                    missing = [size for key_path, size in keys if (key_path, size) not in self.images]
+                if not missing:
+                    continue
+                # 파일 하나는 한 번만 디코딩하고 필요한 크기들로 스케일링
+                scaled = self._load(keys[0][0], missing)
+                with self.lock:
+                    for size, image in scaled.items():
+                        self.images.setdefault((keys[0][0], size), image)
+
+        self.thread = threading.Thread(target=run, name="asset-preload", daemon=True)
+        self.thread.start()
+
+    def pixmap(self, path, size):
+        """
+        (경로, 크기)에 맞게 비율을 유지해 스케일링한 QPixmap을 반환하는 함수 (GUI 스레드 전용)
+        Argv:
+            path (str): 이미지 파일 경로
+            size (QSize or tuple): 이미지가 들어갈 최대 크기
+
+        Returns:
+            QPixmap: 스케일링된 pixmap. 파일을 읽을 수 없으면 null QPixmap
+        """
+        key = self._key(path, size)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            return pixmap
+        with self.lock:
+            image = self.images.get(key)
+        if image is None:
+            image = self._load(key[0], [key[1]]).get(key[1])
+            if image is None:
+                # 없는 파일은 매번 다시 읽지 않도록 null pixmap도 보관
+                self.pixmaps[key] = QPixmap()
+                return self.pixmaps[key]
+            with self.lock:
+                self.images[key] = image
+        pixmap = QPixmap.fromImage(image)
+        self.pixmaps[key] = pixmap
+        return pixmap
+
+    def invalidate(self, path):
+        """파일 내용이 바뀌었을 때 그 경로의 모든 크기를 캐시에서 지웁니다. (GUI 스레드에서 호출)"""
+        path = os.path.normpath(path)
+        with self.lock:
+            for key in [key for key in self.images if key[0] == path]:
+                del self.images[key]
+        for key in [key for key in self.pixmaps if key[0] == path]:
+            del self.pixmaps[key]
+
+# 앱 전체가 함께 쓰는 캐시
+assets = AssetCache()
+
+def preload_game_assets(emoji_registry):
+    """
+    게임 화면들이 쓰는 이모지와 디자인 이미지를 화면에 표시할 크기로 미리 만들어 둡니다. (앱 시작 시 호출)
+    Argv:
+        emoji_registry (EmojiRegistry): 미리 만들어 둘 이모지 목록
+    """
+    from back_button import BTN_WIDTH, BTN_HEIGHT
+    emoji_size = (flag['EMOJI_IMAGE_SIZE'], flag['EMOJI_IMAGE_SIZE'])
+    score_size = (flag['SCORE_IMAGE_SIZE'], flag['SCORE_IMAGE_SIZE'])
+    requests = {
+        flag['EMPTY_SCORE_IMAGE']: [score_size],
+        flag['FILLED_SCORE_IMAGE']: [score_size],
+        flag['MAIN_BUTTON_IMAGE']: [(BTN_WIDTH, BTN_HEIGHT)],
+        flag['BUTTON_EXIT_IMAGE_PATH']: [(BTN_WIDTH, BTN_HEIGHT)],
+    }
+    for emoji in emoji_registry:
+        requests[emoji.path] = [emoji_size]
+    assets.preload(requests)
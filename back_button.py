@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import QPushButton
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QIcon, QPixmap, QCursor, QMouseEvent
+from asset_cache import assets
 
 # 표준 버튼 상수 정의 (109x101, 마진 20)
 # 화면 크기 1920x1080 기준
@@ -26,9 +27,9 @@ class ClickableButton(QPushButton):
         self.clicked.connect(connect_func)
         
         # 3. 스타일 및 아이콘 설정
-        icon_pixmap = QPixmap(icon_path)
         icon_size = QSize(BTN_WIDTH, BTN_HEIGHT)
-        scaled_icon = icon_pixmap.scaled(icon_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        # 화면마다 같은 아이콘을 다시 디코딩하지 않도록 캐시에서 가져옴
+        scaled_icon = assets.pixmap(icon_path, icon_size)
         
         self.setIcon(QIcon(scaled_icon))
         self.setIconSize(icon_size)
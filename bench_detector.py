@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from person_detector import BACKENDS, create_detector
+
+# 사람 검출 backend별 속도와 결과 일치도를 비교하는 스크립트
+# 사용법: python bench_detector.py [이미지 폴더] [반복 횟수]
+# 첫 번째로 만들어진 backend(기본 torch)를 기준으로 나머지 backend의 박스를 비교함
+
+def load_images(image_dir):
+    images = []
+    for f in sorted(os.listdir(image_dir)):
+        if f.lower().endswith(('.png', '.jpg', '.jpeg')):
+            img = cv2.imread(os.path.join(image_dir, f))
+            if img is not None:
+                images.append((f, img))
+    return images
+
+def largest_box(boxes):
+    """가장 큰 박스 (crop_person이 고르는 박스). 없으면 None"""
+    if len(boxes) == 0:
+        return None
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return boxes[int(np.argmax(areas)), :4]
+
+def iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+def run_backend(detector, images, repeat):
+    """
+    Returns:
+        Tuple: (프레임별 지연 시간 리스트(ms), 이미지별 가장 큰 박스 리스트)
+    """
+    # 첫 실행은 초기화 비용이 포함되므로 측정에서 제외
+    detector.detect([images[0][1]])
+    latencies = []
+    boxes = []
+    for _ in range(repeat):
+        boxes = []
+        for _, img in images:
+            start = time.perf_counter()
+            result = detector.detect([img])[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+            boxes.append(largest_box(result))
+    return latencies, boxes
+
+if __name__ == "__main__":
+    image_dir = sys.argv[1] if len(sys.argv) >= 2 else 'img/human'
+    repeat = int(sys.argv[2]) if len(sys.argv) >= 3 else 3
+    images = load_images(image_dir)
+    print(f"{len(images)} images x {repeat}")
+
+    reference = None
+    for backend in BACKENDS:
+        try:
+            # 다른 backend로 대신 실행하면 비교가 의미 없으므로 fallback하지 않음
+            detector = create_detector(backend, fallback=False)
+        except Exception as e:
+            print(f"[{backend}] 건너뜀: {e}")
+            continue
+        latencies, boxes = run_backend(detector, images, repeat)
+        line = (
+            f"[{backend}] mean {np.mean(latencies):.1f} ms, "
+            f"p50 {np.percentile(latencies, 50):.1f} ms, p95 {np.percentile(latencies, 95):.1f} ms, "
+            f"person found {sum(b is not None for b in boxes)}/{len(boxes)}"
+        )
+        if reference is None:
+            reference = (backend, boxes)
+            line += " (기준)"
+        else:
+            # 기준 backend와 같은 사람 박스를 골랐는지 비교
+            pairs = [(a, b) for a, b in zip(reference[1], boxes) if a is not None and b is not None]
+            same_found = sum((a is None) == (b is None) for a, b in zip(reference[1], boxes))
+            ious = [iou(a, b) for a, b in pairs]
+            line += (
+                f", 검출 여부 일치 {same_found}/{len(boxes)}"
+                f", {reference[0]} 대비 IoU mean {np.mean(ious) if ious else 0:.3f}"
+                f" min {np.min(ious) if ious else 0:.3f}"
+            )
+        print(line)
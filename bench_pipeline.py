@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from compare import (
+    PIPELINE_MODES, extract_frame_vectors, compare_blendshape_vector, rank_emojis, warmup
+)
+from reference_store import image_label, list_images
+import person_in_frame
+
+# pipeline mode('direct', 'detect')별 속도와 정확도를 비교하는 스크립트
+# 사용법: python bench_pipeline.py [사람 이미지 폴더] [이모지 폴더] [반복 횟수]
+# 사람 이미지의 파일 이름은 이모지와 같은 라벨로 시작해야 함. ex) 15_sullen.jpg
+
+def load_images(image_dir):
+    images = []
+    for f in list_images(image_dir):
+        # 라벨 번호가 없는 파일은 정답을 알 수 없으므로 건너뜀
+        if image_label(f) is None:
+            continue
+        img = cv2.imread(os.path.join(image_dir, f))
+        if img is not None:
+            images.append((image_label(f), f, img))
+    return images
+
+if __name__ == "__main__":
+    human_dir = sys.argv[1] if len(sys.argv) >= 2 else 'img/human'
+    emoji_dir = sys.argv[2] if len(sys.argv) >= 3 else 'img/emoji'
+    repeat = int(sys.argv[3]) if len(sys.argv) >= 4 else 3
+    images = load_images(human_dir)
+    emoji_files = list_images(emoji_dir)
+    print(f"{len(images)} images x {repeat}")
+
+    # 모델 로드 시간은 측정에서 제외
+    warmup()
+    person_in_frame.warmup()
+
+    for mode in PIPELINE_MODES:
+        latencies = []
+        for _ in range(repeat):
+            found, top1, similarities = 0, 0, []
+            for label, _, img in images:
+                start = time.perf_counter()
+                vector = extract_frame_vectors([img], mode=mode)[0]
+                latencies.append((time.perf_counter() - start) * 1000)
+                if vector is None:
+                    continue
+                found += 1
+                similarities.append(compare_blendshape_vector(vector, label))
+                ranking = rank_emojis(vector, emoji_files, k=1)
+                top1 += bool(ranking) and ranking[0][0] == label
+        print(
+            f"[{mode}] mean {np.mean(latencies):.1f} ms, p95 {np.percentile(latencies, 95):.1f} ms, "
+            f"face found {found}/{len(images)}, top-1 {top1}/{len(images)}, "
+            f"own-label similarity mean {np.mean(similarities) if similarities else 0:.2f}%"
+        )
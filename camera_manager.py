@@ -0,0 +1,151 @@
+import os
+import re
+import threading
+import cv2
+from mainmenu import flag
+
+# 리눅스에서 웹캠 정보를 읽어올 sysfs 경로
+V4L_SYSFS = "/sys/class/video4linux"
+# sysfs가 없는 OS(Windows, macOS)에서 직접 열어볼 웹캠 번호 범위
+MAX_PROBE_INDEX = 10
+# 웹캠을 하나도 찾지 못했을 때 플레이어 순서대로 사용할 번호
+DEFAULT_INDEXES = [0, 1]
+
+def list_v4l_cameras(sysfs=V4L_SYSFS):
+    """
+    /sys/class/video4linux의 장치 정보로 영상 캡처용 웹캠 번호를 찾는 함수 (장치를 열지 않음)
+    UVC 웹캠은 카메라 하나당 /dev/video 노드를 두 개(영상, 메타데이터) 만들므로 index가 0인 노드만 사용함.
+    ex) 웹캠 두 대 -> video0, video1(메타데이터), video2, video3(메타데이터) -> [0, 2]
+
+    Returns:
+        List of int: 웹캠 번호 리스트 (오름차순). sysfs가 없으면 None
+    """
+    if not os.path.isdir(sysfs):
+        return None
+    indexes = []
+    for entry in os.listdir(sysfs):
+        match = re.fullmatch(r'video(\d+)', entry)
+        if not match:
+            continue
+        try:
+            with open(os.path.join(sysfs, entry, 'index')) as file:
+                node_index = int(file.read().strip())
+        except (OSError, ValueError):
+            node_index = 0
+        if node_index == 0:
+            indexes.append(int(match.group(1)))
+    return sorted(indexes)
+
+class CameraManager:
+    """
+    앱 전체가 함께 쓰는 웹캠 관리자
+    웹캠 목록은 처음 한 번만 찾아 두고, 한 번 연 웹캠은 화면(Game 1, 2, 3)을 옮겨 다녀도 닫지 않음.
+    따라서 게임을 시작할 때마다 웹캠을 다시 찾거나 열고 해상도를 맞추느라 기다리지 않음.
+    한 번에 한 화면만 웹캠을 읽으므로, 화면의 capture 스레드가 open()으로 받은 웹캠을 그대로 읽음.
+    웹캠 목록은 discover()로 백그라운드 스레드에서 찾으며, 웹캠을 직접 열어 보는 동안에는 lock을 잡지 않음.
+    camera_indexes()는 찾기가 끝날 때까지 기다리므로 GUI 스레드가 아닌 capture 스레드에서 호출함.
+    """
+    def __init__(self, width=flag['VIDEO_WIDTH'], height=flag['VIDEO_HEIGHT'], fps=30.0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        # 찾은 웹캠 번호 리스트 (처음 사용할 때 한 번만 찾음)
+        self._indexes = None
+        # 웹캠 목록을 찾는 백그라운드 스레드와 찾기가 끝났음을 알리는 이벤트
+        self._discovery = None
+        self._discovered = threading.Event()
+        # 웹캠 번호 -> 열어 둔 cv2.VideoCapture
+        self.captures = {}
+        # capture 스레드들이 동시에 open()을 호출할 수 있으므로 lock 사용
+        self.lock = threading.Lock()
+
+    def _open_capture(self, camera_index):
+        cap = cv2.VideoCapture(camera_index)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        cap.set(cv2.CAP_PROP_FPS, self.fps)
+        # 화면을 옮기는 동안 쌓인 오래된 프레임을 읽지 않도록 버퍼를 최소로 둠
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def _find_cameras(self):
+        """
+        웹캠 번호를 찾는 함수 (lock을 잡지 않은 채 discovery 스레드에서 실행)
+        Returns:
+            Tuple: (웹캠 번호 리스트, 확인하느라 열어 본 {웹캠 번호: cv2.VideoCapture})
+        """
+        indexes = list_v4l_cameras()
+        if indexes is not None:
+            return indexes, {}
+        # sysfs가 없으면 직접 열어서 확인하고, 연 웹캠은 그대로 보관해 다시 열지 않음
+        captures = {}
+        for camera_index in range(MAX_PROBE_INDEX):
+            cap = self._open_capture(camera_index)
+            if cap is not None:
+                captures[camera_index] = cap
+        return list(captures), captures
+
+    def _discover(self):
+        indexes, captures = self._find_cameras()
+        with self.lock:
+            for camera_index, cap in captures.items():
+                if camera_index in self.captures:
+                    cap.release()
+                else:
+                    self.captures[camera_index] = cap
+            self._indexes = indexes
+        print(f"사용 가능한 웹캠: {indexes}")
+        self._discovered.set()
+
+    def discover(self):
+        """웹캠 목록 찾기를 백그라운드 스레드에서 시작합니다. 이미 시작했으면 아무것도 하지 않으므로 GUI 스레드에서 호출해도 됩니다."""
+        with self.lock:
+            if self._discovery is None:
+                self._discovery = threading.Thread(target=self._discover, name="camera-discovery", daemon=True)
+                self._discovery.start()
+
+    def camera_indexes(self, count=1):
+        """
+        플레이어 순서대로 사용할 웹캠 번호를 반환하는 함수
+        아직 웹캠 목록을 찾는 중이면 끝날 때까지 기다리므로 capture 스레드에서 호출함.
+        Argv:
+            count (int): 필요한 웹캠 수
+
+        Returns:
+            List of int: count개의 웹캠 번호. 찾은 웹캠이 부족하면 DEFAULT_INDEXES에서 채움
+        """
+        self.discover()
+        self._discovered.wait()
+        with self.lock:
+            indexes = self._indexes[:count]
+        for default_index in DEFAULT_INDEXES:
+            if len(indexes) >= count:
+                break
+            if default_index not in indexes:
+                indexes.append(default_index)
+        return indexes
+
+    def open(self, camera_index):
+        """
+        열어 둔 웹캠을 반환하는 함수. 아직 열지 않았으면 열어서 보관함 (capture 스레드에서 호출)
+        Returns:
+            cv2.VideoCapture: 해상도와 FPS가 설정된 웹캠. 열 수 없으면 None
+        """
+        with self.lock:
+            cap = self.captures.get(camera_index)
+            if cap is None or not cap.isOpened():
+                cap = self._open_capture(camera_index)
+                if cap is None:
+                    return None
+                self.captures[camera_index] = cap
+            return cap
+
+    def shutdown(self):
+        """앱 종료 시 열어 둔 웹캠을 모두 닫습니다. (capture 스레드를 모두 멈춘 뒤 호출)"""
+        with self.lock:
+            for cap in self.captures.values():
+                cap.release()
+            self.captures = {}
@@ -1,40 +1,158 @@
-import mediapipe as mp
 import cv2
 import numpy as np
-import os, re
-import pandas as pd
-from person_in_frame import person_in_frame
-
-# 매번 모델을 새로 로드하는것을 방지하기 위해
-# 미리 mediapipe facelandmarker 모델 선언
-baseoptions = mp.tasks.BaseOptions
-facelandmarker = mp.tasks.vision.FaceLandmarker
-facelandmarkeroptions = mp.tasks.vision.FaceLandmarkerOptions
-visionrunningmode = mp.tasks.vision.RunningMode
-model_path = 'face_landmarker.task'
-options = facelandmarkeroptions(
-    base_options=baseoptions(model_asset_path=model_path),
-    running_mode=visionrunningmode.IMAGE,
-    output_face_blendshapes=True,
-    output_facial_transformation_matrixes=False,
-    num_faces=1,
-)
-landmarker = facelandmarker.create_from_options(options)
-# 이모지와 비슷한 표정을 가진 사람의 특징점들을 담은 csv파일
-features = pd.read_csv('faces.csv')
-
-def extract_blendshape_scores(img):
+import os, time
+from person_in_frame import persons_in_frames
+from person_tracker import crop_with_trackers
+from model_registry import MODEL_CONFIG, face_landmarker_path
+import reference_store
+from reference_index import ReferenceIndex
+
+PIPELINE_MODES = ('direct', 'detect')
+
+# mediapipe와 모델, 참조 특징값은 import 시점이 아니라 처음 사용할 때 로드함.
+# (GUI 프로세스가 이 모듈을 import해도 모델 로드 때문에 시작이 늦어지지 않도록)
+# 미리 로드하려면 warmup()을 호출
+mp = None
+landmarker = None
+
+def _import_mediapipe():
+    global mp
+    if mp is None:
+        import mediapipe
+        mp = mediapipe
+    return mp
+
+def create_landmarker(running_mode="IMAGE"):
+    """
+    주어진 실행 모드로 FaceLandmarker를 생성하는 함수
+    Argv:
+        running_mode (str): "IMAGE" (사진 한 장) 또는 "VIDEO" (연속 프레임)
+
+    Returns:
+        FaceLandmarker: blendshape 출력이 켜진 얼굴 한 개용 landmarker
+    """
+    vision = _import_mediapipe().tasks.vision
+    options = vision.FaceLandmarkerOptions(
+        base_options=mp.tasks.BaseOptions(model_asset_path=face_landmarker_path()),
+        running_mode=getattr(vision.RunningMode, running_mode),
+        output_face_blendshapes=True,
+        output_facial_transformation_matrixes=False,
+        num_faces=1,
+    )
+    return vision.FaceLandmarker.create_from_options(options)
+
+def get_landmarker():
+    """IMAGE 모드 landmarker를 처음 호출될 때 한 번만 생성해 반환합니다."""
+    global landmarker
+    if landmarker is None:
+        landmarker = create_landmarker()
+    return landmarker
+
+class LandmarkerSession:
+    """
+    카메라 한 대의 연속된 프레임을 처리하는 VIDEO 모드 FaceLandmarker 세션
+    VIDEO 모드에서는 이전 프레임의 얼굴 위치를 추적하므로
+    매 프레임 얼굴 검출을 처음부터 다시 하지 않음.
+    카메라(플레이어)마다 하나씩 만들어 같은 프로세스 안에서만 사용해야 함.
+    """
+    def __init__(self):
+        self.landmarker = create_landmarker("VIDEO")
+        self.last_timestamp_ms = -1
+
+    def detect(self, mp_image):
+        # VIDEO 모드는 단조 증가하는 timestamp를 요구함
+        timestamp_ms = max(time.monotonic_ns() // 1_000_000, self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        return self.landmarker.detect_for_video(mp_image, timestamp_ms)
+
+    def close(self):
+        self.landmarker.close()
+
+# 이모지와 비슷한 표정을 가진 사람의 특징점들을 담은 참조값 파일 (reference_store.py 참고)
+references_path = reference_store.DEFAULT_PATH
+
+# 매 프레임마다 참조값을 다시 변환하지 않도록 처음 사용할 때 한 번만 인덱스로 만듦
+blendshape_names, reference_index = None, None
+_same_category_order = None
+# rebuild=False로 읽었지만 맞지 않았던 참조값 파일의 상태. 파일이 바뀌기 전까지는 다시 읽지 않음
+_stale_file_state = None
+
+def _references_file_state():
+    stat = os.stat(references_path)
+    return stat.st_mtime_ns, stat.st_size
+
+def load_references(rebuild=True):
+    """
+    참조값 파일을 처음 호출될 때 한 번만 읽어 비교용 인덱스로 변환합니다.
+    파일이 없거나 landmarker 모델이 바뀌어 참조값이 맞지 않으면 사람 이미지에서 다시 만듭니다.
+    Argv:
+        rebuild (bool): False면 다시 만들지 않고 FileNotFoundError / StaleReferenceError를 그대로 발생시킴.
+                        GUI 스레드처럼 오래 멈추면 안 되는 곳에서 사용하며, 참조값은 worker 프로세스나
+                        EmojiWatcher가 백그라운드에서 다시 만든 파일을 다음 호출 때 읽음.
+                        맞지 않았던 파일은 바뀌기 전까지 다시 읽지 않으므로 매 프레임 호출해도 됨
+
+    Returns:
+        Tuple: (특징 이름 리스트, ReferenceIndex)
+    """
+    global blendshape_names, reference_index, _stale_file_state
+    if reference_index is None:
+        try:
+            if not rebuild and _stale_file_state is not None and _references_file_state() == _stale_file_state:
+                raise reference_store.StaleReferenceError("참조값이 아직 다시 만들어지지 않았습니다.")
+            state = _references_file_state()
+            try:
+                refs = reference_store.load(references_path)
+            except reference_store.StaleReferenceError:
+                _stale_file_state = state
+                raise
+        except (FileNotFoundError, reference_store.StaleReferenceError) as e:
+            if not rebuild:
+                raise
+            print(f"참조값을 다시 만듭니다: {e}")
+            refs, report = reference_store.build(path=references_path)
+            print(report)
+        blendshape_names = list(refs.categories)
+        reference_index = ReferenceIndex(refs.vectors, refs.labels)
+    return blendshape_names, reference_index
+
+def set_references(refs):
+    """
+    앱 실행 중 참조값이 다시 만들어졌을 때 비교용 인덱스를 새 참조값으로 교체합니다.
+    특징 이름 순서가 바뀌었을 수 있으므로 mediapipe 특징 순서도 다음 프레임에서 다시 확인함.
+    Argv:
+        refs (ReferenceSet): reference_store.build로 만든 참조값
+    """
+    global blendshape_names, reference_index, _same_category_order
+    new_index = ReferenceIndex(refs.vectors, refs.labels)
+    blendshape_names, reference_index, _same_category_order = list(refs.categories), new_index, None
+
+def warmup(session=None):
+    """
+    landmarker와 참조 특징값을 미리 로드하고, 빈 이미지로 한 번 실행해 두는 함수
+    첫 프레임의 처리가 모델 로드 때문에 늦어지지 않도록 worker 시작 시 호출
+    Argv:
+        session (LandmarkerSession): 함께 실행해 둘 세션. None이면 IMAGE 모드 landmarker 사용
+    """
+    load_references()
+    extract_blendshape_scores(np.zeros((64, 64, 3), dtype=np.uint8), session)
+
+def extract_blendshape_scores(img, session=None):
     """
     주어진 이미지로부터 표정 특징점들을 추출하는 함수
     Argv:
         img (np.ndarray): 웹캠의 frame이나 이미지 파일. (H, W, C)
+        session (LandmarkerSession): 연속 프레임용 세션. None이면 IMAGE 모드 landmarker 사용
 
     Returns:
         List of dict: {특징 이름: 값} 형태의 모든 특징값들을 담은 딕셔너리 리스트
                       만약 받은 사진이 얼굴 사진이 아니라면 None 반환
     """
+    mp = _import_mediapipe()
     mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=img)
-    detection_result = landmarker.detect(mp_image)
+    if session is None:
+        detection_result = get_landmarker().detect(mp_image)
+    else:
+        detection_result = session.detect(mp_image)
 
     # 추출된 표정 특징이 존재하면 blendshape score 반환
     if detection_result.face_blendshapes:
@@ -77,57 +195,189 @@ def compare_blendshape_scores(blendshape1, blendshape2):
     similarity = np.clip(dot_product / (magnitude1 * magnitude2), 0, 1) * 100.0
     return similarity
 
-def emoji_to_csv(emoji_dir, human_dir):
-    import csv
-    img_paths = os.listdir(emoji_dir)
-    labels = [re.sub(r'(\_)(\w+)(\.\w+)$', '', f) for f in img_paths]
-    img_paths = [re.sub(r'(\.\w+)$', '', f)+".jpg" for f in img_paths]
-    print(img_paths)
-    for img_path, label in zip(img_paths, labels):
-        img = cv2.imread(os.path.join(human_dir, img_path))
-        blendshape = extract_blendshape_scores(img)
-        scores = [bs.score for bs in blendshape]
-        if not os.path.exists("faces.csv"):
-            with open("faces.csv", "w", encoding="UTF-8", newline="") as file:
-                header = [bs.category_name for bs in blendshape]
-                header.extend(["labels"])
-                writer = csv.writer(file)
-                writer.writerow(header)
-        with open("faces.csv", "a", encoding="UTF-8", newline="") as file:
-            writer = csv.writer(file)
-            scores.extend([label])
-            writer.writerow(scores)
-            
-def calc_similarity(face_img, emoji):
-    """
-    잘라낸 얼굴 이미지와 비교할 이모지의 표정 유사도를 구하는 함수
+def blendshape_to_vector(blendshape):
+    """
+    extract_blendshape_scores로 구한 특징값을 정규화된 벡터로 변환하는 함수
+    Argv:
+        blendshape (list): extract_blendshape_scores함수로 구한 특징값 리스트
+
+    Returns:
+        np.ndarray: 참조값의 특징 순서를 따르는 (D,) float32 단위 벡터
+                    특징값이 None이거나 크기가 0이면 None 반환
+    """
+    if blendshape is None:
+        return None
+    global _same_category_order
+    blendshape_names, _ = load_references()
+    # mediapipe의 특징 순서가 csv 헤더와 같은지는 처음 한 번만 확인
+    if _same_category_order is None:
+        _same_category_order = [bs.category_name for bs in blendshape] == blendshape_names
+    if _same_category_order:
+        vector = np.fromiter((bs.score for bs in blendshape), dtype=np.float32, count=len(blendshape))
+    else:
+        # 순서가 다르면 이름으로 다시 정렬
+        scores = {bs.category_name: bs.score for bs in blendshape}
+        vector = np.array([scores.get(name, 0.0) for name in blendshape_names], dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        return None
+    return vector / norm
+
+def compare_blendshape_vector(vector, label):
+    """
+    정규화된 특징 벡터와 label 이모지의 참조 벡터 사이의 유사도를 반환하는 함수
+    label에 참조 얼굴이 여러 장이면 설정된 방식(max / top-k 평균)으로 모은 값을 반환
+    Argv:
+        vector (np.ndarray): blendshape_to_vector함수로 구한 단위 벡터
+        label (int): 비교할 이모지의 라벨 번호
+
+    Returns:
+        Float: 코사인 유사도 (%). 벡터가 None이거나 참조값이 없으면 0 반환
+    """
+    if vector is None:
+        return 0.0
+    _, reference_index = load_references()
+    return reference_index.score_label(vector, label)
+
+def rank_emojis(vector, emoji_files, k=3):
+    """
+    특징 벡터를 모든 이모지의 참조 벡터와 한 번에 비교해 상위 k개를 반환하는 함수
+    Argv:
+        vector (np.ndarray): blendshape_to_vector함수로 구한 단위 벡터
+        emoji_files (list of str): 후보 이모지 파일 이름 리스트. ex) ["15_sullen.png", ...]
+        k (int): 반환할 이모지 개수
+
+    Returns:
+        List of tuple: 유사도 내림차순 (label, 파일 이름, 유사도 %) 리스트
+                       벡터가 None이면 빈 리스트 반환
+    """
+    if vector is None:
+        return []
+    _, reference_index = load_references()
+    # 라벨 -> 후보 이모지 파일 (라벨 번호가 없는 파일은 건너뜀)
+    label_to_file = {}
+    for emoji_file in emoji_files:
+        label = reference_store.image_label(emoji_file)
+        if label is not None:
+            label_to_file.setdefault(label, emoji_file)
+    # 모든 후보 이모지의 참조 얼굴과 한 번에 비교
+    ranking = reference_index.rank(vector, label_to_file.keys(), k)
+    return [(label, label_to_file[label], score) for label, score in ranking]
+
+def extract_person_vector(person_img, session=None):
+    """
+    YOLO로 잘라낸 사람 이미지에서 정규화된 표정 특징 벡터를 구하는 함수
+    Argv:
+        person_img (np.ndarray): person_in_frame으로 잘라낸 BGR 이미지. None이면 None 반환
+        session (LandmarkerSession): 같은 카메라의 프레임을 이어서 처리할 세션 (선택)
+
+    Returns:
+        np.ndarray: blendshape_to_vector의 단위 벡터. 얼굴이 없으면 None
+    """
+    if person_img is None:
+        return None
+    img2 = cv2.cvtColor(person_img, cv2.COLOR_BGR2RGB)
+    return blendshape_to_vector(extract_blendshape_scores(img2, session))
+
+def extract_frame_vectors(frames, sessions=None, mode=None, trackers=None):
+    """
+    웹캠 frame들에서 정규화된 표정 특징 벡터를 구하는 함수
+    Argv:
+        frames (list of np.ndarray): BGR frame 리스트
+        sessions (list of LandmarkerSession): frame별 세션. None이면 IMAGE 모드 landmarker 사용
+        mode (str): 'direct' 또는 'detect'. None이면 MODEL_CONFIG['pipeline_mode']
+                    'direct'는 frame을 바로 landmarker에 넣고, 얼굴을 못 찾은 frame만 YOLO로 잘라 다시 시도
+                    'detect'는 항상 YOLO로 사람을 잘라낸 뒤 landmarker에 넣음
+        trackers (list of PersonTracker): frame별 사람 박스 추적기 (선택)
+                    주어지면 YOLO를 매번 실행하지 않고 이전 박스를 재사용해 잘라냄
+    'direct' 모드에서 잘라낸 이미지로 다시 시도할 때는 세션을 쓰지 않고 IMAGE 모드 landmarker를 사용함.
+    세션(VIDEO 모드)은 전체 frame을 이어서 추적하고 있으므로, 크기와 위치가 다른 잘라낸 이미지를 섞어 넣으면
+    mediapipe의 얼굴 추적이 어긋나기 때문.
+    YOLO는 잘라낼 frame이 생겼을 때 처음 로드되며, 'direct' 모드에서는 YOLO를 불러올 수 없어도
+    바로 얼굴을 찾은 frame의 결과는 그대로 반환함.
+
+    Returns:
+        List: frame별 blendshape_to_vector의 단위 벡터. 얼굴이 없으면 None
+    """
+    mode = mode or MODEL_CONFIG['pipeline_mode']
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"지원하지 않는 pipeline mode입니다: {mode} (지원: {', '.join(PIPELINE_MODES)})")
+    if sessions is None:
+        sessions = [None] * len(frames)
+
+    vectors = [None] * len(frames)
+    if mode == 'direct':
+        # FaceLandmarker도 내부에서 얼굴을 찾으므로 YOLO 없이 먼저 시도
+        for i, (frame, session) in enumerate(zip(frames, sessions)):
+            vectors[i] = extract_person_vector(frame, session)
+    # 얼굴을 못 찾은 frame만 YOLO를 한 번의 batch로 돌려 사람 영역을 잘라 다시 시도
+    retry = [i for i, vector in enumerate(vectors) if vector is None]
+    if not retry:
+        return vectors
+    crop_sessions = sessions if mode == 'detect' else [None] * len(frames)
+    try:
+        _extract_from_crops(frames, retry, vectors, crop_sessions, trackers)
+    except Exception as e:
+        if mode == 'detect':
+            raise
+        _warn_detector_unavailable(e)
+    return vectors
+
+_detector_warning_shown = False
+
+def _warn_detector_unavailable(error):
+    # 프레임마다 같은 경고를 출력하지 않도록 한 번만 출력
+    global _detector_warning_shown
+    if not _detector_warning_shown:
+        print(f"경고: 사람 검출(YOLO)을 사용할 수 없어 얼굴을 바로 찾은 프레임만 사용합니다: {error}")
+        _detector_warning_shown = True
+
+def _extract_from_crops(frames, retry, vectors, sessions, trackers):
+    """
+    retry 번호의 frame을 YOLO로 찾은 사람 영역으로 잘라 특징 벡터를 구해 vectors에 채우는 함수
+    Argv:
+        sessions (list): frame별 잘라낸 이미지에 쓸 세션. None이면 IMAGE 모드 landmarker
+    """
+    if trackers is None:
+        persons = persons_in_frames([frames[i] for i in retry])
+        for i, person in zip(retry, persons):
+            vectors[i] = extract_person_vector(person, sessions[i])
+        return
+    # 재사용한 박스에서 얼굴을 놓치면 그 frame만 바로 YOLO를 다시 실행해 한 번 더 시도
+    for _ in range(2):
+        crops, detected = crop_with_trackers([frames[i] for i in retry], [trackers[i] for i in retry])
+        for i, crop in zip(retry, crops):
+            vectors[i] = extract_person_vector(crop, sessions[i])
+            if vectors[i] is None:
+                trackers[i].mark_lost()
+        retry = [i for i, was_detected in zip(retry, detected) if vectors[i] is None and not was_detected]
+        if not retry:
+            break
+
+def calc_similarity(face_img, emoji, session=None):
+    """
+    얼굴 사진과 비교할 이모지의 표정 유사도를 구하는 함수
     Argv:
-        face_img (np.ndarray): 비교할 얼굴 사진
+        face_img (np.ndarray): 비교할 얼굴 사진 (BGR)
         emoji (str): 비교할 이모지의 파일 이름.
                      ex) 15_sullen.png
+        session (LandmarkerSession): 같은 카메라의 프레임을 이어서 처리할 세션 (선택)
 
     Returns:
-        Float: 사진과 이모지 사이의 유사도 값 (%)
+        Float: 사진과 이모지 사이의 유사도 값 (%). 라벨 번호가 없는 파일 이름이면 0
     """
-    # 해당 이모지의 표정 특징 값 가져오기
+    label = reference_store.image_label(emoji)
+    if label is None:
+        return 0
+    # 설정된 pipeline mode로 표정 특징을 구한 뒤 해당 이모지의 표정 특징 값과 비교
     try:
-        # emoji에서 라벨 분리
-        img2 = person_in_frame(face_img)
-        if img2 is None: return 0
-        img2 = cv2.cvtColor(img2, cv2.COLOR_BGR2RGB)
-        label = int(re.sub(r'(\_)(\w+)(\.\w+)?$', '', emoji))
-        feature = features[features["labels"] == label].values[0]
-        blend1 = extract_blendshape_scores(img2)
-        blend2 = {features.keys()[i]: feature[i] for i in range(len(features.keys()))}
-        
-        return compare_blendshape_scores(blend1, blend2)
+        vector = extract_frame_vectors([face_img], [session])[0]
+        return compare_blendshape_vector(vector, label)
     except:
         print("유사도 측정 실패")
         return 0
 
-# 테스트 코드. import시 작동하지 않음.
+# 참조값 다시 만들기. import시 작동하지 않음.
+# (python reference_store.py build 와 같음)
 if __name__ == "__main__":
-    emoji_to_csv(
-        emoji_dir='img/emoji',
-        human_dir='img/human'
-    )
\ No newline at end of file
+    reference_store.main(['build'])
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os
+import random
+import compare
+from reference_store import EMOJI_DIR, StaleReferenceError, image_label, list_images
+from asset_cache import assets
+
+class Emoji:
+    """이모지 한 개의 정보. id는 파일 이름 앞의 라벨 번호로, 참조 얼굴의 라벨과 같음"""
+    def __init__(self, emoji_id, name, file_name, path):
+        self.id = emoji_id
+        # '15_sullen.png' -> 'sullen'
+        self.name = name
+        self.file_name = file_name
+        self.path = path
+        # 참조 인덱스(ReferenceIndex)에서 이 이모지의 행 번호. 참조 얼굴이 없으면 None
+        self.reference_row = None
+
+    def pixmap(self, size):
+        """화면에 표시할 크기로 스케일링해 캐시해 둔 QPixmap (GUI 스레드 전용)"""
+        return assets.pixmap(self.path, size)
+
+    def __repr__(self):
+        return f"Emoji({self.id}, {self.name!r})"
+
+class EmojiRegistry:
+    """
+    Game 1, 2, 3과 inference worker가 함께 쓰는 이모지 목록
+    앱 시작 시 이모지 폴더를 한 번만 읽어 id(라벨 번호)별 Emoji를 만들어 두고,
+    화면과 worker는 파일 이름 대신 정수 id로 이모지를 다룸.
+    프레임마다 파일 이름에서 라벨을 다시 꺼내거나 라벨을 참조 인덱스의 행으로 바꾸지 않고,
+    미리 연결해 둔 행 번호로 바로 유사도를 구함.
+    """
+    def __init__(self, emoji_dir=EMOJI_DIR):
+        self.emoji_dir = emoji_dir
+        # id -> Emoji (id 오름차순)
+        self.emojis = {}
+        # 행 번호를 연결한 참조 인덱스. compare의 참조 인덱스가 바뀌면 다시 연결함
+        self.reference_index = None
+        self.scan()
+
+    def scan(self):
+        """이모지 폴더를 읽어 목록을 만듭니다. 라벨 번호가 없는 파일은 건너뛰고, 같은 번호는 첫 파일만 사용합니다."""
+        emojis = {}
+        try:
+            files = list_images(self.emoji_dir)
+        except FileNotFoundError:
+            print(f"경고: 이모지 폴더({self.emoji_dir})를 찾을 수 없습니다.")
+            files = []
+        for file_name in files:
+            emoji_id = image_label(file_name)
+            if emoji_id is None:
+                print(f"경고: 라벨 번호가 없는 이모지 파일은 사용하지 않습니다: {file_name}")
+                continue
+            if emoji_id in emojis:
+                print(f"경고: 이모지 번호 {emoji_id}가 중복되어 {file_name}은 사용하지 않습니다.")
+                continue
+            name = os.path.splitext(file_name)[0].split('_', 1)[-1]
+            emojis[emoji_id] = Emoji(emoji_id, name, file_name, os.path.join(self.emoji_dir, file_name))
+        self.emojis = dict(sorted(emojis.items()))
+        self.reference_index = None
+
+    def __len__(self):
+        return len(self.emojis)
+
+    def __iter__(self):
+        return iter(self.emojis.values())
+
+    def __contains__(self, emoji_id):
+        return emoji_id in self.emojis
+
+    def __getitem__(self, emoji_id):
+        return self.emojis[emoji_id]
+
+    def ids(self):
+        return list(self.emojis)
+
+    def random_id(self, exclude=None):
+        """
+        Argv:
+            exclude (int): 고르지 않을 이모지 id (직전 이모지). 이모지가 하나뿐이면 무시
+        Returns:
+            Int: 무작위로 고른 이모지 id. 이모지가 없으면 None
+        """
+        candidates = [emoji_id for emoji_id in self.emojis if emoji_id != exclude] or list(self.emojis)
+        return random.choice(candidates) if candidates else None
+
+    def references(self):
+        """
+        이모지별 행 번호가 연결된 참조 인덱스를 반환하는 함수
+        참조값은 처음 호출될 때 읽고, 참조 인덱스가 새로 만들어졌으면 행 번호를 다시 연결함.
+        GUI 스레드에서 호출되므로 참조값 파일이 없거나 맞지 않아도 여기서 다시 만들지 않음.
+        (worker 프로세스가 모델을 로드하면서, 또는 EmojiWatcher가 백그라운드에서 다시 만듦)
+        Returns:
+            ReferenceIndex: 참조값이 아직 준비되지 않았으면 None
+        """
+        try:
+            _, reference_index = compare.load_references(rebuild=False)
+        except (FileNotFoundError, StaleReferenceError):
+            return None
+        if reference_index is not self.reference_index:
+            for emoji in self.emojis.values():
+                emoji.reference_row = reference_index.label_to_index.get(emoji.id)
+            self.reference_index = reference_index
+        return reference_index
+
+    def similarity(self, vector, emoji_id):
+        """
+        Argv:
+            vector (np.ndarray): blendshape_to_vector의 단위 벡터. None이면 0
+            emoji_id (int): 비교할 이모지 id
+
+        Returns:
+            Float: 이모지와의 유사도 (%). 참조 얼굴이 없거나 목록에서 빠진 이모지, 참조값이 준비되지 않았으면 0
+        """
+        emoji = self.emojis.get(emoji_id)
+        if vector is None or emoji is None:
+            return 0.0
+        reference_index = self.references()
+        if reference_index is None:
+            return 0.0
+        return float(reference_index.score_rows(vector, [emoji.reference_row])[0])
+
+    def rank(self, vector, k=3):
+        """
+        특징 벡터와 가장 비슷한 이모지 k개를 찾는 함수
+        Returns:
+            List of tuple: 유사도 내림차순 (Emoji, 유사도 %) 리스트. 벡터가 None이거나 참조값이 준비되지 않았으면 빈 리스트
+        """
+        if vector is None:
+            return []
+        reference_index = self.references()
+        if reference_index is None:
+            return []
+        ranking = reference_index.rank(vector, self.emojis.keys(), k)
+        return [(self.emojis[emoji_id], score) for emoji_id, score in ranking]
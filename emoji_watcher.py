@@ -0,0 +1,118 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+import compare
+import reference_store
+from reference_store import HUMAN_DIR, IMAGE_EXTENSIONS
+from asset_cache import assets, preload_game_assets
+from mainmenu import flag
+
+def snapshot(directories):
+    """
+    폴더들의 이미지 파일 상태를 읽는 함수 (파일을 열지 않고 stat만 함)
+    Returns:
+        Dict: {파일 경로: (수정 시각 ns, 크기)}. 없는 폴더는 건너뜀
+    """
+    state = {}
+    for directory in directories:
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                if entry.is_file():
+                    stat = entry.stat()
+                    state[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+class EmojiWatcher(QObject):
+    """
+    앱을 다시 시작하지 않고 이모지와 참조 얼굴을 추가/교체할 수 있도록 이모지 폴더와 사람 이미지 폴더를 감시하는 객체
+    주기마다 두 폴더의 파일 상태(stat)만 비교하고, 바뀐 상태가 한 주기 동안 그대로면 (복사가 끝났으면)
+    백그라운드 스레드에서 reference_store.build로 새로 생기거나 바뀐 사람 이미지의 특징값만 추출함.
+    build는 spawn으로 만든 별도 프로세스에서 실행하므로 mediapipe가 GUI 프로세스에 로드되지 않고,
+    추출하는 동안 GIL을 잡고 있어 화면이 끊기는 일도 없음.
+    추출이 끝나면 GUI 스레드에서 compare의 참조 인덱스를 교체하고 EmojiRegistry를 다시 읽으며,
+    내용이 바뀐 이모지 이미지는 pixmap 캐시에서 지운 뒤 다시 미리 만들어 둠.
+    이모지와의 비교는 GUI 쪽(InferenceWorker)에서 하므로 worker 프로세스는 다시 시작하거나 모델을 다시 로드하지 않음.
+    """
+    # 새 이모지 목록과 참조값을 적용한 뒤 GUI 스레드에서 발생. 인자는 BuildReport (참조값을 만들지 못했으면 None)
+    reloaded = pyqtSignal(object)
+    # 백그라운드 스레드 -> GUI 스레드로 추출 결과 (ReferenceSet, BuildReport, 폴더 상태)를 전달하는 내부 신호
+    _built = pyqtSignal(object, object, object)
+
+    def __init__(self, emoji_registry, human_dir=HUMAN_DIR, interval_ms=flag['EMOJI_RELOAD_INTERVAL_MS'], parent=None):
+        """
+        Argv:
+            emoji_registry (EmojiRegistry): 바뀐 이모지를 반영할 이모지 목록 (emoji_registry.emoji_dir를 감시)
+            human_dir (str): 참조 얼굴 이미지 폴더
+            interval_ms (int): 폴더를 확인하는 주기 (ms)
+        """
+        super().__init__(parent)
+        self.emoji_registry = emoji_registry
+        self.directories = (emoji_registry.emoji_dir, human_dir)
+        self.human_dir = human_dir
+        self.interval_ms = interval_ms
+        # 마지막으로 반영한 폴더 상태 (앱 시작 시의 상태)
+        self.applied = snapshot(self.directories)
+        # 바뀐 것을 발견했지만 아직 복사 중일 수 있어 다음 주기까지 기다리는 상태
+        self.pending = None
+        self.thread = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+        self._built.connect(self._apply)
+
+    def start(self):
+        self.timer.start(self.interval_ms)
+
+    def stop(self):
+        self.timer.stop()
+
+    def poll(self):
+        # 이전 추출이 아직 끝나지 않았으면 끝난 뒤에 다시 확인
+        if self.thread is not None and self.thread.is_alive():
+            return
+        state = snapshot(self.directories)
+        if state == self.applied:
+            self.pending = None
+            return
+        if state != self.pending:
+            self.pending = state
+            return
+        self.pending = None
+        self.thread = threading.Thread(target=self._build, args=(state,), name="emoji-reload", daemon=True)
+        self.thread.start()
+
+    def _build(self, state):
+        # 이미 추출해 둔 사람 이미지(같은 sha256)는 다시 추출하지 않음
+        # 추출이 끝나면 프로세스를 닫아, 다음 변경까지 mediapipe가 메모리에 남아 있지 않도록 함
+        try:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                refs, report = pool.submit(
+                    reference_store.build, self.emoji_registry.emoji_dir, self.human_dir, compare.references_path
+                ).result()
+        except Exception as e:
+            print(f"참조값을 다시 만들지 못했습니다: {e}")
+            refs, report = None, None
+        self._built.emit(refs, report, state)
+
+    def _apply(self, refs, report, state):
+        # 내용이 바뀐 기존 파일 (새로 생긴 파일은 캐시에 없음)
+        changed = [path for path, stat in state.items() if self.applied.get(path, stat) != stat]
+        self.applied = state
+        if refs is not None:
+            compare.set_references(refs)
+            print(f"참조값을 다시 불러왔습니다: {report}")
+        for path in changed:
+            assets.invalidate(path)
+        # 이모지별 참조 행 번호는 다음 비교 때 새 참조 인덱스에 다시 연결됨
+        self.emoji_registry.scan()
+        preload_game_assets(self.emoji_registry)
+        print(f"이모지 목록을 다시 불러왔습니다: {len(self.emoji_registry)}개")
+        self.reloaded.emit(report)
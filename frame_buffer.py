@@ -0,0 +1,237 @@
+import cv2
+import numpy as np
+from queue import Empty, Full
+from multiprocessing import shared_memory, Queue, Value
+
+def _attach_shared_memory(name):
+    """
+    이미 만들어진 shared memory에 연결하는 함수
+    worker는 생성한 프로세스의 resource_tracker를 같이 쓰므로
+    연결하는 쪽에서는 따로 추적 등록을 하지 않음 (해제는 생성한 쪽이 담당).
+    """
+    try:
+        # Python 3.13 이상
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+class FrameRingBuffer:
+    """
+    프로세스 간에 BGR 프레임을 주고받기 위한 고정 슬롯 shared memory 링 버퍼
+    프레임은 shared memory 슬롯에 직접 쓰고, 큐로는 (슬롯 번호, 시퀀스 번호)만 보냄.
+    따라서 프레임을 pickle하거나 Manager 프로세스를 거치지 않음.
+
+    GUI 프로세스에서 생성(write 담당)하고, Process 인자로 넘기면
+    worker 프로세스에서는 같은 shared memory에 자동으로 연결됨(read 담당).
+    """
+    # 슬롯마다 (seq, height, width)를 int64로 저장
+    HEADER_FIELDS = 3
+
+    def __init__(self, width, height, slots=4):
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.slot_size = width * height * 3
+        header_bytes = slots * self.HEADER_FIELDS * 8
+        self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * self.slot_size)
+        self.owner = True
+        self._map_arrays()
+        # 아직 쓰이지 않은 슬롯은 seq = -1
+        self.headers[:] = -1
+        self.next_seq = 0
+
+    def _map_arrays(self):
+        header_bytes = self.slots * self.HEADER_FIELDS * 8
+        self.headers = np.ndarray((self.slots, self.HEADER_FIELDS), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray(
+            (self.slots, self.slot_size), dtype=np.uint8, buffer=self.shm.buf, offset=header_bytes
+        )
+
+    # spawn 방식의 Process 인자로 넘길 때는 이름만 전달하고 받는 쪽에서 다시 연결
+    def __getstate__(self):
+        return {
+            'name': self.shm.name,
+            'width': self.width,
+            'height': self.height,
+            'slots': self.slots,
+        }
+
+    def __setstate__(self, state):
+        self.width = state['width']
+        self.height = state['height']
+        self.slots = state['slots']
+        self.slot_size = self.width * self.height * 3
+        self.shm = _attach_shared_memory(state['name'])
+        self.owner = False
+        self._map_arrays()
+        self.next_seq = 0
+
+    def write(self, frame):
+        """
+        프레임을 다음 슬롯에 복사하는 함수
+        Argv:
+            frame (np.ndarray): 웹캠의 BGR frame. (H, W, 3)
+
+        Returns:
+            Tuple: (슬롯 번호, 시퀀스 번호). 큐로는 이 두 값만 보내면 됨
+        """
+        seq = self.next_seq
+        slot = seq % self.slots
+        self.next_seq += 1
+
+        h, w = frame.shape[:2]
+        # 카메라가 요청한 해상도보다 큰 프레임을 주면 비율을 유지한 채 슬롯 크기에 맞춤
+        if h * w * 3 > self.slot_size:
+            scale = (self.slot_size / (h * w * 3)) ** 0.5
+            w, h = max(1, int(w * scale)), max(1, int(h * scale))
+            frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_AREA)
+
+        # 쓰는 도중에는 seq를 -1로 두어 읽는 쪽이 덜 쓰인 프레임을 가져가지 않도록 함
+        self.headers[slot, 0] = -1
+        self.frames[slot, :h * w * 3].reshape(h, w, 3)[:] = frame
+        self.headers[slot, 1] = h
+        self.headers[slot, 2] = w
+        self.headers[slot, 0] = seq
+        return slot, seq
+
+    def read(self, slot, seq):
+        """
+        슬롯에서 프레임을 복사해 오는 함수
+        Argv:
+            slot (int): write가 반환한 슬롯 번호
+            seq (int): write가 반환한 시퀀스 번호
+
+        Returns:
+            np.ndarray: (H, W, 3) BGR frame 복사본
+                        그 사이 슬롯이 새 프레임으로 덮어써졌다면 None 반환
+        """
+        if self.headers[slot, 0] != seq:
+            return None
+        h, w = int(self.headers[slot, 1]), int(self.headers[slot, 2])
+        frame = self.frames[slot, :h * w * 3].reshape(h, w, 3).copy()
+        # 복사하는 동안 덮어써졌는지 다시 확인
+        if self.headers[slot, 0] != seq:
+            return None
+        return frame
+
+    def close(self):
+        """shared memory 연결을 닫고, 생성한 쪽이면 메모리도 해제합니다."""
+        self.headers = None
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class LatestFrameChannel:
+    """
+    capture 스레드에서 worker로 '가장 최근 프레임만' 전달하는 채널
+    큐에는 최대 한 개의 프레임만 대기하고, worker가 밀리면 대기 중이던 오래된 프레임을
+    새 프레임으로 교체함. 따라서 worker가 느려도 추론 지연과 메모리 사용량이 일정하게 유지됨.
+    버려진 프레임 수는 dropped로 확인할 수 있음.
+
+    프레임에는 보낼 때의 목표 epoch 번호가 함께 붙음. GUI가 목표 이모지를 바꿀 때 next_epoch()로
+    번호를 올리면, worker는 이전 epoch의 프레임을 추론하지 않고 버림.
+
+    여러 카메라에서 같은 시점에 찍은 프레임은 같은 pair 번호를 붙여 보내며,
+    worker는 pair의 프레임이 모든 채널에 도착할 때까지 기다렸다가 한 batch로 처리함.
+    """
+    def __init__(self, width, height, slots=4):
+        self.frames = FrameRingBuffer(width, height, slots)
+        self.queue = Queue(maxsize=1)
+        # 버려진 프레임 수 (worker에서도 읽을 수 있도록 shared memory 사용)
+        self._dropped = Value('Q', 0, lock=False)
+        # 현재 목표 epoch 번호 (GUI만 쓰고 capture 스레드와 worker는 읽기만 함)
+        self._epoch = Value('q', 0, lock=False)
+
+    @property
+    def dropped(self):
+        return self._dropped.value
+
+    @property
+    def epoch(self):
+        return self._epoch.value
+
+    def next_epoch(self):
+        """
+        목표가 바뀌었음을 알리는 함수 (GUI 전용)
+        Returns:
+            Int: 새 epoch 번호. 이후 put하는 프레임과 그 결과에 이 번호가 붙음
+        """
+        self._epoch.value += 1
+        return self._epoch.value
+
+    def put(self, frame, pair=None):
+        """
+        프레임을 링 버퍼에 쓰고 worker에게 알리는 함수 (capture 스레드 전용)
+        Argv:
+            frame (np.ndarray): 웹캠의 BGR frame. (H, W, 3)
+            pair (tuple): 같은 시점에 여러 채널로 보내는 프레임의 (pair 번호, 함께 보내는 프레임 수).
+                          다른 채널과 맞출 필요가 없으면 None
+
+        Returns:
+            Int: 프레임의 시퀀스 번호
+        """
+        # 프레임을 쓰기 전에 epoch를 읽어, 목표가 바뀌기 전에 찍힌 프레임에 새 번호가 붙지 않도록 함
+        epoch = self._epoch.value
+        slot, seq = self.frames.write(frame)
+        item = (slot, seq, epoch, pair)
+        # worker가 아직 이전 프레임을 가져가지 않았으면 그 프레임을 버리고 교체
+        # 꺼내는 사이에 worker가 먼저 가져가거나 다른 항목이 들어와도, 새 프레임이 들어갈 때까지 반복하므로
+        # 버려지는 쪽은 항상 오래된 프레임임
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return seq
+            except Full:
+                pass
+            try:
+                stale = self.queue.get_nowait()
+            except Empty:
+                continue
+            if stale[0] is None:
+                # 종료 신호는 버리지 않고 다시 넣고, 새 프레임은 보내지 않음
+                self.queue.put(stale)
+                self._dropped.value += 1
+                return seq
+            self._dropped.value += 1
+
+    def get(self, timeout=None):
+        """
+        가장 최근 프레임을 받아오는 함수 (worker 전용)
+        Argv:
+            timeout (float): 최대 대기 시간(초). None이면 프레임이 올 때까지 대기,
+                             0이면 기다리지 않음. 시간 안에 프레임이 없으면 queue.Empty 발생
+
+        Returns:
+            Tuple: (시퀀스 번호, BGR frame, 프레임을 보낼 때의 epoch 번호, put에 넘긴 pair)
+                   stop()으로 종료 신호를 받으면 None 반환
+        """
+        while True:
+            if timeout == 0:
+                slot, seq, epoch, pair = self.queue.get_nowait()
+            else:
+                slot, seq, epoch, pair = self.queue.get(timeout=timeout)
+            if slot is None:
+                return None
+            # 목표가 바뀌기 전에 보낸 프레임은 추론하지 않고 버림
+            if epoch != self._epoch.value:
+                continue
+            frame = self.frames.read(slot, seq)
+            # 처리하기 전에 새 프레임으로 덮어써졌으면 다음 프레임을 기다림
+            if frame is not None:
+                return seq, frame, epoch, pair
+
+    def stop(self):
+        """worker에게 종료 신호를 보냅니다. 종료 신호는 버려지지 않도록 대기 중인 프레임을 비운 뒤 넣습니다."""
+        try:
+            self.queue.get_nowait()
+        except Empty:
+            pass
+        try:
+            self.queue.put((None, None, None, None), timeout=1)
+        except Full:
+            pass
+
+    def close(self):
+        self.frames.close()
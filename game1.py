@@ -1,18 +1,16 @@
 # (기존 import 및 클래스 정의 유지)
 import cv2
-import random
-import os
 from PyQt5.QtWidgets import (
     QWidget, QPushButton, QVBoxLayout, QLabel, 
     QHBoxLayout, QGridLayout, QSpacerItem, QSizePolicy, QStackedWidget
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize, QPointF
 from PyQt5.QtGui import QImage, QPixmap, QFont, QPainter, QPen, QColor, QIcon, QPainterPath, QBrush, QCursor, QMouseEvent
-from compare import calc_similarity
 import numpy as np
 from mainmenu import flag
-from multiprocessing import Queue, Manager, Process
 from back_button import create_main_menu_button
+from video_widget import FrameScaler, VideoWidget, FrameMailbox
+from asset_cache import assets
 
 # ClickableLabel 클래스
 class ClickableLabel(QLabel):
@@ -79,41 +77,19 @@ class OutlinedLabel(QLabel):
 
         painter.drawPath(path)
 
-# 유사도를 계산할 Worker함수
-def similarity_worker(item_queue, similarity_value):
-    while True:
-        item = item_queue.get()
-        if item is None:
-            print("Queue empty!")
-            continue
-        # frame queue에 값이 들어올 때까지 대기
-        frame, emoji = item
-        if frame is None:
-            print(f"Worker terminated.")
-            break
-        try:
-            # 들어온 프레임으로 유사도 계산
-            similarity = 0 if emoji == "" else calc_similarity(frame, emoji)
-            # 최대 유사도만 저장
-            current_similarity = similarity_value.value
-            if similarity > current_similarity:
-                similarity_value.value = similarity
-        except:
-            print("유사도 계산 실패!")
-
-
 # 웹캠 처리를 위한 QThread 클래스
 class VideoThread(QThread):
-    # QImage로 변환한 frame과 player_index를 신호로 보냄
-    change_pixmap_score_signal = pyqtSignal(QImage, int)
+    # 화면 크기로 줄인 BGR frame과 player_index를 신호로 보냄 (VideoWidget.set_frame으로 표시)
+    change_pixmap_score_signal = pyqtSignal(object, int)
     signal_ready = pyqtSignal()
                                         
-    # 비교할 emoji 파일이름과 player_index를 받음
-    # 유사도 계산 Worker를 사용할 item_queue와 similarity value 추가
+    # 비교할 emoji id와 player_index를 받음
+    # 유사도 계산 Worker에 최신 프레임을 전달할 channel 추가
     def __init__(self,
-                 item_queue,
+                 channel,
+                 camera_manager,
                  camera_index=0,
-                 emotion_file='0_angry.png',
+                 emoji_id=None,
                  player_index='0',
                  width=flag["VIDEO_WIDTH"], height=flag["VIDEO_HEIGHT"]):
         super().__init__()
@@ -121,46 +97,121 @@ class VideoThread(QThread):
         self.running = True
         self.width = width
         self.height = height
-        self.emotion_file = emotion_file
+        self.emoji_id = emoji_id
         self.player_index = player_index
 
         # 추론 프레임 간격 증가
         self.frame_count = 0
         self.inference_interval = 3  # 3프레임당 1회 추론
-        self.item_queue = item_queue
+        self.channel = channel
+        self.camera_manager = camera_manager
+        self.scaler = FrameScaler(width, height)
 
     def run(self):
-        cap = cv2.VideoCapture(self.camera_index)
+        # 웹캠은 CameraManager가 열어 두고 관리하므로 여기서 열거나 닫지 않음
+        cap = self.camera_manager.open(self.camera_index)
         
-        if not cap.isOpened():
+        if cap is None:
             print(f"Error: Could not open camera {self.camera_index}. Check index or availability.")
             self.running = False
             return
 
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
-        TARGET_FPS = 30.0
-        cap.set(cv2.CAP_PROP_FPS, TARGET_FPS)
         self.signal_ready.emit()
 
         while self.running:
             ret, frame = cap.read()
             if ret:
-                h, w, ch = frame.shape
-                bytes_per_line = ch * w
                 self.frame_count += 1
-                if self.frame_count % self.inference_interval == 1:
-                    self.item_queue.put((frame.copy(), self.emotion_file))
-                rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                convert_to_Qt_format = QImage(
-                    rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888
-                )
-                p = convert_to_Qt_format.scaled(self.width, self.height, Qt.KeepAspectRatio)
-                self.change_pixmap_score_signal.emit(p, self.player_index)
+                if self.emoji_id is not None and self.frame_count % self.inference_interval == 1:
+                    # 프레임은 shared memory에 쓰고, worker가 밀려 있으면 이전 프레임은 버림
+                    # (이모지와의 비교는 worker가 아니라 GUI 쪽에서 함)
+                    self.channel.put(frame)
+                # 색 변환 없이 미리 할당한 버퍼에 화면 크기로 줄여서 보냄
+                self.change_pixmap_score_signal.emit(self.scaler.scale(frame), self.player_index)
             self.msleep(1)
         
-        cap.release()
-        
+    def stop(self):
+        self.running = False
+        self.wait()
+
+# 두 플레이어의 웹캠을 같은 순간에 읽는 QThread 클래스
+class DualCaptureThread(QThread):
+    """
+    두 플레이어의 웹캠을 한 스레드에서 함께 읽는 capture 스레드
+    두 카메라에 먼저 grab()을 연달아 호출해 같은 시점의 프레임을 잡아 둔 뒤 retrieve()로 디코딩하므로,
+    두 플레이어의 프레임이 같은 순간에, 같은 횟수만큼 worker로 전달됨.
+    카메라마다 스레드를 따로 돌려 CPU를 나눠 쓰는 것보다 공정하고 가벼움.
+    """
+    # 화면 크기로 줄인 BGR frame과 player_index를 신호로 보냄 (VideoWidget.set_frame으로 표시)
+    change_pixmap_score_signal = pyqtSignal(object, int)
+    signal_ready = pyqtSignal()
+
+    def __init__(self,
+                 channels,
+                 camera_manager,
+                 camera_indexes=None,
+                 emoji_id=None,
+                 width=flag["VIDEO_WIDTH"], height=flag["VIDEO_HEIGHT"]):
+        """
+        Argv:
+            channels (list of LatestFrameChannel): 플레이어 순서대로의 프레임 채널
+            camera_manager (CameraManager): 웹캠을 열어 두고 빌려주는 관리자
+            camera_indexes (tuple of int): 플레이어 순서대로의 웹캠 번호
+                                           None이면 스레드 안에서 camera_manager가 찾은 웹캠 두 대를 사용
+            emoji_id (int): 비교할 이모지 id. None이면 worker에 프레임을 보내지 않음
+        """
+        super().__init__()
+        self.channels = channels
+        self.camera_manager = camera_manager
+        self.camera_indexes = camera_indexes
+        self.running = True
+        self.width = width
+        self.height = height
+        self.emoji_id = emoji_id
+        self.scalers = [FrameScaler(width, height) for _ in range(len(channels))]
+
+        # 두 플레이어가 같은 프레임 번호에서 함께 추론됨
+        self.frame_count = 0
+        self.inference_interval = 3  # 3프레임당 1회 추론
+
+    def open_capture(self, camera_index):
+        # 웹캠은 CameraManager가 열어 두고 관리하므로 스레드가 끝나도 닫지 않음
+        cap = self.camera_manager.open(camera_index)
+        if cap is None:
+            print(f"Error: Could not open camera {camera_index}. Check index or availability.")
+        return cap
+
+    def run(self):
+        # 웹캠 목록을 아직 찾는 중이면 GUI 스레드 대신 이 스레드에서 기다림
+        if self.camera_indexes is None:
+            self.camera_indexes = self.camera_manager.camera_indexes(len(self.channels))
+        print(f"웹캠 스트리밍 (P1: 인덱스 {self.camera_indexes[0]}, P2: 인덱스 {self.camera_indexes[1]}) 시작")
+        caps = [self.open_capture(index) for index in self.camera_indexes]
+        if all(cap is None for cap in caps):
+            self.running = False
+            return
+        self.signal_ready.emit()
+
+        while self.running:
+            # 모든 카메라에서 먼저 grab만 해 두 프레임의 촬영 시점을 맞춤 (디코딩은 그 다음)
+            grabbed = [cap is not None and cap.grab() for cap in caps]
+            self.frame_count += 1
+            submit = self.emoji_id is not None and self.frame_count % self.inference_interval == 1
+            frames = []
+            for player_index, (cap, ok) in enumerate(zip(caps, grabbed)):
+                if not ok:
+                    continue
+                ret, frame = cap.retrieve()
+                if ret:
+                    frames.append((player_index, frame))
+            for player_index, frame in frames:
+                if submit:
+                    # 같은 시점의 프레임에 같은 pair 번호를 붙여 worker가 모두 도착한 뒤 한 batch로 처리하도록 함
+                    self.channels[player_index].put(frame, pair=(self.frame_count, len(frames)))
+                # 색 변환 없이 미리 할당한 버퍼에 화면 크기로 줄여서 보냄
+                self.change_pixmap_score_signal.emit(self.scalers[player_index].scale(frame), player_index)
+            self.msleep(1)
+
     def stop(self):
         self.running = False
         self.wait()
@@ -275,29 +326,26 @@ class Resultscreen(QWidget):
 # 3. 게임 화면 (Game1Screen) - 간격 조절 반영 및 스코어보드 추가
 # ----------------------------------------------------------------------
 class Game1Screen(QWidget):
-    def __init__(self, stacked_widget):
+    def __init__(self, stacked_widget, worker_pool, camera_manager, emoji_registry):
         super().__init__()
         self.stacked_widget = stacked_widget
+        # 앱 전체가 함께 쓰는 inference worker pool, 웹캠 관리자, 이모지 목록
+        self.worker_pool = worker_pool
+        self.camera_manager = camera_manager
+        self.emoji_registry = emoji_registry
         
-        self.video_threads = []
+        # 두 플레이어의 웹캠을 함께 읽는 capture 스레드
+        self.capture_thread = None
+        # capture 스레드의 프레임을 플레이어(feed)별로 가장 최근 것만 GUI에 전달
+        self.frame_mailbox = FrameMailbox(flag['VIDEO_DISPLAY_FPS'], self)
+        self.frame_mailbox.frame_ready.connect(self.update_image_and_score)
         
-        if os.path.isdir("img/emoji"):
-            self.emotion_ids = os.listdir("img/emoji")
-        else:
-            self.emotion_ids = ["default.png"]
-            print("경고: 'img/emoji' 폴더를 찾을 수 없습니다. 기본값 사용.")
-        
-        # Worker의 값을 받을 manager
-        manager = Manager()
         self.p1_score = 0
         self.p2_score = 0
-        self.p1_queue = manager.Queue()
-        self.p2_queue = manager.Queue()
-        self.p1_max_similarity = manager.Value(float, 0.0)
-        self.p2_max_similarity = manager.Value(float, 0.0)
-        self.current_emotion_file = ""
-        self.p1_worker = None
-        self.p2_worker = None
+        # 현재 라운드의 목표 이모지 id (없으면 None)
+        self.current_emoji_id = None
+        # 게임 중에 pool에서 빌려 쓰는 worker (두 플레이어의 프레임을 함께 처리)
+        self.worker = None
         self.round = 0
 
         
@@ -390,7 +438,7 @@ class Game1Screen(QWidget):
         # 이모지 레이블 설정
         self.emotion_label = QLabel() 
         self.emotion_label.setAlignment(Qt.AlignCenter)
-        self.emotion_label.setFixedSize(240, 240)
+        self.emotion_label.setFixedSize(flag['EMOJI_IMAGE_SIZE'], flag['EMOJI_IMAGE_SIZE'])
         self.emotion_label.setStyleSheet("border: 0px solid #ccc; background-color: #f0f0f0;")
         self.emotion_label.hide() # 초기에는 이모지 레이블 숨김
 
@@ -449,7 +497,7 @@ class Game1Screen(QWidget):
         self.player1_webcam_title.setAlignment(Qt.AlignCenter)
         player1_v_layout.addWidget(self.player1_webcam_title, alignment=Qt.AlignCenter) 
         
-        self.player1_video = QLabel('웹캠 1 피드')
+        self.player1_video = VideoWidget('웹캠 1 피드')
         self.player1_video.setAlignment(Qt.AlignCenter)
         self.player1_video.setFixedSize(flag['VIDEO_WIDTH'], flag['VIDEO_HEIGHT'])
         self.player1_video.setStyleSheet("background-color: black; color: white;")
@@ -490,7 +538,7 @@ class Game1Screen(QWidget):
         self.player2_webcam_title.setAlignment(Qt.AlignCenter)
         player2_v_layout.addWidget(self.player2_webcam_title, alignment=Qt.AlignCenter) 
 
-        self.player2_video = QLabel('웹캠 2 피드')
+        self.player2_video = VideoWidget('웹캠 2 피드')
         self.player2_video.setAlignment(Qt.AlignCenter)
         self.player2_video.setFixedSize(flag['VIDEO_WIDTH'], flag['VIDEO_HEIGHT'])
         self.player2_video.setStyleSheet("background-color: black; color: white;")
@@ -595,47 +643,41 @@ class Game1Screen(QWidget):
             
     # P1, P2 점수에 따라 이미지(하트)를 업데이트하는 함수
     def update_score_display(self):
+        # 하트 이미지는 캐시에서 이미 스케일링된 pixmap을 가져옴
+        score_size = (flag['SCORE_IMAGE_SIZE'], flag['SCORE_IMAGE_SIZE'])
         # P1 점수 표시 업데이트
         for i in range(self.MAX_ROUNDS):
-            pixmap = QPixmap(flag['FILLED_SCORE_IMAGE'] if i < self.p1_score else flag['EMPTY_SCORE_IMAGE'])
+            pixmap = assets.pixmap(flag['FILLED_SCORE_IMAGE'] if i < self.p1_score else flag['EMPTY_SCORE_IMAGE'], score_size)
             if not pixmap.isNull():
-                scaled_pixmap = pixmap.scaled(
-                    flag['SCORE_IMAGE_SIZE'], flag['SCORE_IMAGE_SIZE'], Qt.KeepAspectRatio, Qt.SmoothTransformation
-                )
-                self.p1_score_images[i].setPixmap(scaled_pixmap)
+                self.p1_score_images[i].setPixmap(pixmap)
             else:
                 self.p1_score_images[i].setText("?") 
 
         # P2 점수 표시 업데이트
         for i in range(self.MAX_ROUNDS):
-            pixmap = QPixmap(flag['FILLED_SCORE_IMAGE'] if i < self.p2_score else flag['EMPTY_SCORE_IMAGE'])
+            pixmap = assets.pixmap(flag['FILLED_SCORE_IMAGE'] if i < self.p2_score else flag['EMPTY_SCORE_IMAGE'], score_size)
             if not pixmap.isNull():
-                scaled_pixmap = pixmap.scaled(
-                    flag['SCORE_IMAGE_SIZE'], flag['SCORE_IMAGE_SIZE'], Qt.KeepAspectRatio, Qt.SmoothTransformation
-                )
-                self.p2_score_images[i].setPixmap(scaled_pixmap)
+                self.p2_score_images[i].setPixmap(pixmap)
             else:
                 self.p2_score_images[i].setText("?") 
         
-    # 랜덤으로 선택된 이모지 파일명을 받아 QLabel에 표시하는 함수
-    def set_required_emotion(self, emotion_file):
-        self.current_emotion_file = emotion_file
-        self.video_threads[0].emotion_file = self.current_emotion_file
-        self.video_threads[1].emotion_file = self.current_emotion_file
-        file_path = os.path.join("img/emoji", emotion_file)
-
-        pixmap = QPixmap(file_path)
+    # 랜덤으로 선택된 이모지 id를 받아 QLabel에 표시하는 함수
+    def set_required_emotion(self, emoji_id):
+        emoji = self.emoji_registry[emoji_id]
+        self.current_emoji_id = emoji_id
+        self.capture_thread.emoji_id = self.current_emoji_id
+        # 목표 이모지는 GUI 쪽에서 비교하므로 worker가 처리 중인 프레임도 바로 새 이모지와 비교됨
+        self.worker.set_target(0, self.current_emoji_id)
+        self.worker.set_target(1, self.current_emoji_id)
+
+        # 앱 시작 시 미리 디코딩/스케일링해 둔 이모지 사용
+        pixmap = emoji.pixmap(self.emotion_label.size())
         if pixmap.isNull():
-            self.emotion_label.setText(f"이미지 없음: {emotion_file}")
-            print(f"[Error] Emoji image not found at {file_path}")
+            self.emotion_label.setText(f"이미지 없음: {emoji.file_name}")
+            print(f"[Error] Emoji image not found at {emoji.path}")
             self.emotion_label.setStyleSheet("border: 0px solid #ccc; background-color: #f0f0f0; color: red;")
         else:
-            scaled_pixmap = pixmap.scaled(
-                self.emotion_label.size(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            self.emotion_label.setPixmap(scaled_pixmap)
+            self.emotion_label.setPixmap(pixmap)
             self.emotion_label.setStyleSheet("border: 0px solid #ccc; background-color: #f0f0f0;")
         
     # update_timer 함수
@@ -653,15 +695,17 @@ class Game1Screen(QWidget):
                 self.game_timer.stop()
                 
                 # --- 라운드 승패 판정 ---
-                if self.p1_max_similarity.value == self.p2_max_similarity.value:
+                p1_max_similarity = self.worker.max_similarity(0)
+                p2_max_similarity = self.worker.max_similarity(1)
+                if p1_max_similarity == p2_max_similarity:
                     self.timer_label.setText("무승부! 재도전")
-                    self.current_emotion_file = ""
+                    self.current_emoji_id = None
                     QTimer.singleShot(2000, self.start_next_round)
                 else:
-                    if self.p1_max_similarity.value > self.p2_max_similarity.value: # 플레이어1 승리
+                    if p1_max_similarity > p2_max_similarity: # 플레이어1 승리
                         self.timer_label.setText("P1 승리!")
                         self.p1_score += 1
-                        self.current_emotion_file = ""
+                        self.current_emoji_id = None
                         if self.p1_score < self.MAX_ROUNDS:
                             QTimer.singleShot(2000, self.start_next_round)
 
@@ -669,14 +713,14 @@ class Game1Screen(QWidget):
                     else: # 플레이어2 승리
                         self.timer_label.setText("P2 승리!")
                         self.p2_score += 1
-                        self.current_emotion_file = ""
+                        self.current_emoji_id = None
                         if self.p2_score < self.MAX_ROUNDS:
                             QTimer.singleShot(2000, self.start_next_round)
                     self.update_score_display()
 
                 # --- 게임 종료 결정 (3점 선취승) ---
                 if self.p1_score >= self.MAX_ROUNDS or self.p2_score >= self.MAX_ROUNDS:
-                    self.current_emotion_file = ""
+                    self.current_emoji_id = None
                     self.timer_label.setText("게임 종료!")
                     self.stop_video_streams()
                     
@@ -706,10 +750,8 @@ class Game1Screen(QWidget):
                     self.stacked_widget.setCurrentIndex(2)
                     self.p1_score = 0
                     self.p2_score = 0
-                    self.p1_max_similarity.value = 0
-                    self.p2_max_similarity.value = 0
-                    self.player1_accuracy.setText(f'P1 정확도: {self.p1_max_similarity.value: .2f}%')
-                    self.player2_accuracy.setText(f'P2 정확도: {self.p2_max_similarity.value: .2f}%')
+                    self.player1_accuracy.setText(f'P1 정확도: 0.00%')
+                    self.player2_accuracy.setText(f'P2 정확도: 0.00%')
                     self.player1_video.clear()
                     self.player2_video.clear()
                     self.update_score_display()
@@ -718,15 +760,17 @@ class Game1Screen(QWidget):
     def start_next_round(self):
         if self.p1_score >= self.MAX_ROUNDS or self.p2_score >= self.MAX_ROUNDS:
             return
-        self.p1_max_similarity.value = 0.0
-        self.p2_max_similarity.value = 0.0
+        # 대기 중에 메인 메뉴로 나가 worker를 반납한 경우
+        if self.worker is None:
+            return
+        self.worker.reset_scores()
         # queue에 None값을 넣어 Worker에 종료 시그널 전송
         self.player1_accuracy.setText(f'P1 정확도: 0.00%')
         self.player2_accuracy.setText(f'P2 정확도: 0.00%')
         
-        if self.emotion_ids:
-            random_emotion_id = random.choice(self.emotion_ids)
-            self.set_required_emotion(random_emotion_id)
+        random_emoji_id = self.emoji_registry.random_id()
+        if random_emoji_id is not None:
+            self.set_required_emotion(random_emoji_id)
         
         print(f"새 라운드 시작 (P1 승리: {self.p1_score} / P2 승리: {self.p2_score})")
 
@@ -741,87 +785,35 @@ class Game1Screen(QWidget):
     # update_image_and_score 함수
     def update_image_and_score(self, image, player_index):
         if self.is_game_active:
-            pixmap = QPixmap.fromImage(image)
-            
+            # worker가 아직 모델을 불러오는 중이거나 실패했으면 0% 대신 상태를 표시
+            status = self.worker.status_text()
             if player_index == 0:
-                self.player1_video.setPixmap(pixmap)
-                self.player1_accuracy.setText(f'P1 정확도: {self.p1_max_similarity.value: .2f}%')
+                self.player1_video.set_frame(image)
+                self.player1_accuracy.setText(f'P1 정확도: {status}' if status else f'P1 정확도: {self.worker.max_similarity(0): .2f}%')
                 
             elif player_index == 1:
-                self.player2_video.setPixmap(pixmap)
-                self.player2_accuracy.setText(f'P2 정확도: {self.p2_max_similarity.value: .2f}%')
-
-    def get_available_camera_index(self):
-        """사용 가능한 가장 낮은 인덱스의 웹캠 번호를 반환합니다."""
-        # 리눅스일 때는 0, 2를 강제 반환
-        if os.name == 'posix':
-            return [0, 2]
-        # 0부터 9까지 시도하며, 먼저 열리는 카메라의 인덱스를 반환
-        count = 0
-        idxs = []
-        for index in range(10): 
-            cap = cv2.VideoCapture(index)
-            if cap.isOpened():
-                cap.release()
-                count += 1
-                idxs.append(index) # 성공적인 인덱스 반환
-            if count >= 2:
-                return idxs
-        return [0, 1] # 찾지 못하면 기본값 0 반환
-
-    def start_player2_stream_sequential(self):
-        """P1 워밍업 완료 후 P2 스트림을 시작하고 타이머를 시작합니다."""
-        if len(self.video_threads) < 2: 
-            index = self.get_available_camera_index()
-            thread2 = VideoThread(
-                self.p2_queue,
-                camera_index = index[1],
-                emotion_file = self.current_emotion_file,
-                player_index = 1
-                )
-            thread2.change_pixmap_score_signal.connect(self.update_image_and_score)
-            thread2.signal_ready.connect(self.start_workers)
-            thread2.start()
-            self.video_threads.append(thread2)
-            print(f"웹캠 스트리밍 (P2) 작동 시작: 인덱스 {index[1]}")
-            self.video_threads[0].signal_ready.disconnect(self.start_player2_stream_sequential)
-            
-
-    def start_workers(self):
-        if not self.p2_worker:
-            self.p2_worker = Process(target=similarity_worker, args=(self.p2_queue, self.p2_max_similarity))
-        if self.p2_worker and not self.p2_worker.is_alive():
-            self.p2_worker.start()
-        self.video_threads[1].signal_ready.disconnect(self.start_workers)
-        print("Similarity Worker Started")
-
-        
+                self.player2_video.set_frame(image)
+                self.player2_accuracy.setText(f'P2 정확도: {status}' if status else f'P2 정확도: {self.worker.max_similarity(1): .2f}%')
 
     # start_video_streams 함수
     def start_video_streams(self):
         # 기존 스레드가 실행 중일 수 있으므로 안전하게 중지 및 정리
         self.stop_video_streams()
-        self.video_threads = []
         self.is_game_active = True
 
-        index = self.get_available_camera_index()
+        # 미리 모델을 로드해둔 worker를 pool에서 빌려옴
+        self.worker = self.worker_pool.acquire()
 
-        # 첫 번째 웹캠 스레드
-        thread1 = VideoThread(
-            self.p1_queue,
-            camera_index = index[0],
-            emotion_file = self.current_emotion_file,
-            player_index = 0
+        # 두 웹캠을 한 스레드에서 같은 순간에 읽음
+        self.capture_thread = DualCaptureThread(
+            self.worker.channels,
+            self.camera_manager,
+            emoji_id = self.current_emoji_id,
             )
-        thread1.change_pixmap_score_signal.connect(self.update_image_and_score)
-        self.video_threads.append(thread1)
-        thread1.signal_ready.connect(self.start_player2_stream_sequential)
-        if not self.p1_worker:
-            self.p1_worker = Process(target=similarity_worker, args=(self.p1_queue, self.p1_max_similarity))
-        if self.p1_worker and not self.p1_worker.is_alive():
-            self.p1_worker.start()
-        thread1.start()
-        print(f"웹캠 스트리밍 및 타이머 작동 시작")
+        # capture 스레드에서 바로 우편함에 넣고, GUI에는 우편함이 최신 프레임만 전달
+        self.capture_thread.change_pixmap_score_signal.connect(self.frame_mailbox.post, Qt.DirectConnection)
+        self.capture_thread.start()
+        print("웹캠 스트리밍 및 타이머 작동 시작")
     
 
     # stop_video_streams 함수
@@ -831,20 +823,17 @@ class Game1Screen(QWidget):
         
         self.is_game_active = False
             
-        for thread in self.video_threads:
-            if thread.isRunning():
-                try:
-                    thread.change_pixmap_score_signal.disconnect(self.update_image_and_score)
-                except Exception:
-                    pass
-                thread.stop()
-        self.video_threads = []
-        if self.p1_worker and self.p1_worker.is_alive():
-            self.p1_worker.terminate()
-        if self.p2_worker and self.p2_worker.is_alive():
-            self.p2_worker.terminate()
-        self.p1_worker = None
-        self.p2_worker = None
+        if self.capture_thread and self.capture_thread.isRunning():
+            try:
+                self.capture_thread.change_pixmap_score_signal.disconnect(self.frame_mailbox.post)
+            except Exception:
+                pass
+            self.capture_thread.stop()
+        self.capture_thread = None
+        self.frame_mailbox.clear()
+        # worker는 종료하지 않고 다음 게임을 위해 pool에 반납
+        self.worker_pool.release(self.worker)
+        self.worker = None
         print("웹캠 스트리밍 및 타이머 작동 종료")
 
     # go_to_main_menu 함수 (수정: 오버레이 버튼 표시)
@@ -870,8 +859,6 @@ class Game1Screen(QWidget):
         self.player2_accuracy.setText(f'P2 정확도: 0.00%')
         self.p1_score = 0
         self.p2_score = 0
-        self.p1_max_similarity.value = 0
-        self.p2_max_similarity.value = 0
         self.round = 0
         self.update_score_display()
         self.player1_accuracy.setText(f'P1 정확도: 0.00%')
@@ -881,7 +868,16 @@ class Game1Screen(QWidget):
 if __name__ == '__main__':
     from PyQt5.QtWidgets import QApplication
     import sys
+    from worker_pool import WorkerPool
+    from camera_manager import CameraManager
+    from emoji_registry import EmojiRegistry
     app = QApplication(sys.argv)
-    ex = Game1Screen(None)
+    emoji_registry = EmojiRegistry()
+    worker_pool = WorkerPool(emoji_registry)
+    worker_pool.start()
+    camera_manager = CameraManager()
+    app.aboutToQuit.connect(worker_pool.shutdown)
+    app.aboutToQuit.connect(camera_manager.shutdown)
+    ex = Game1Screen(None, worker_pool, camera_manager, emoji_registry)
     ex.show()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -1,19 +1,18 @@
 import sys
 import cv2
 import time
-import os
 #import mediapipe as mp
 from PyQt5.QtWidgets import (
     QWidget, QPushButton, QVBoxLayout, QLabel,
     QHBoxLayout, QGridLayout, QSpacerItem, QSizePolicy, QStackedWidget
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize, QPointF
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize, QPointF, QTimer
 from PyQt5.QtGui import QImage, QPixmap, QFont, QIcon, QPainter, QPainterPath, QPen, QBrush, QColor, QCursor, QMouseEvent
 from game1 import Game1Screen,Resultscreen
 from mainmenu import MainMenu
 from game1 import VideoThread
-from compare import calc_similarity
 from mainmenu import flag
+from video_widget import FrameScaler, VideoWidget, FrameMailbox
 
 # ClickableLabel 클래스 재사용
 class ClickableLabel(QLabel):
@@ -82,73 +81,74 @@ class OutlinedLabel(QLabel):
 
 # 웹캠 연결 Thread
 class EmojiMatchThread(QThread):
-    change_pixmap_signal = pyqtSignal(QImage)
+    # 화면 크기로 줄인 BGR frame을 보냄 (VideoWidget.set_frame으로 표시)
+    change_pixmap_signal = pyqtSignal(object)
 
-    def __init__(self, camera_index, all_emotion_files, width=flag['VIDEO_WIDTH'], height=flag['VIDEO_HEIGHT']):
+    def __init__(self, camera_manager, camera_index=None, width=flag['VIDEO_WIDTH'], height=flag['VIDEO_HEIGHT']):
         super().__init__()
+        self.camera_manager = camera_manager
         self.camera_index = camera_index
-        self.all_emotion_files = all_emotion_files
         self.width = width
         self.height = height
         self.running = True
 
-        # current_frame_rgb를 OpenCV/NumPy 포맷으로 저장
-        self.current_frame_rgb = None
+        # 캡처 버튼을 눌렀을 때 사용할 최신 BGR frame (OpenCV/NumPy 포맷)
+        self.current_frame = None
+        self.scaler = FrameScaler(width, height)
 
     def stop(self):
         self.running = False
 
     def run(self):
-        # 카메라 인덱스 0이 아닌 경우를 대비해 DSHOW 백엔드 사용
-        cap = cv2.VideoCapture(self.camera_index)
+        # 웹캠 번호를 받지 않았으면 찾은 웹캠 중 첫 번째를 사용 (목록을 찾는 중이면 이 스레드에서 기다림)
+        if self.camera_index is None:
+            self.camera_index = self.camera_manager.camera_indexes(1)[0]
+        # 웹캠은 CameraManager가 열어 두고 관리하므로 여기서 열거나 닫지 않음
+        cap = self.camera_manager.open(self.camera_index)
 
-        if not cap.isOpened():
+        if cap is None:
             print(f"Error: Could not open camera {self.camera_index}. Check index or availability.")
             self.running = False
             return
 
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
-
         while self.running:
             ret, frame = cap.read()
             if ret:
-                rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                self.current_frame_rgb = rgb_image
-                h, w, ch = rgb_image.shape
-                bytes_per_line = ch * w
-
-                # 웹캠 화면 업데이트를 위한 QImage 변환
-                convert_to_Qt_format = QImage(
-                    rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888
-                )
-                p = convert_to_Qt_format.scaled(self.width, self.height, Qt.KeepAspectRatio)
+                self.current_frame = frame
 
-                # 웹캠 화면 업데이트 시그널 전송
-                self.change_pixmap_signal.emit(p)
+                # 웹캠 화면 업데이트 시그널 전송 (색 변환 없이 미리 할당한 버퍼에 화면 크기로 줄임)
+                self.change_pixmap_signal.emit(self.scaler.scale(frame))
 
             self.msleep(50)
 
-        if cap.isOpened():
-              cap.release()
-        print(f"Camera {self.camera_index} released and EmojiMatchThread terminated.")
+        print(f"EmojiMatchThread terminated. (camera {self.camera_index} kept open)")
 
 # Game 2 GUI
 class Game2Screen(QWidget):
-    def __init__(self, stacked_widget):
+    # 순위 결과가 왔는지 확인하는 주기와 최대 대기 시간 (ms)
+    RANKING_POLL_MS = 20
+    RANKING_TIMEOUT_MS = 5000
+
+    def __init__(self, stacked_widget, worker_pool, camera_manager, emoji_registry):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.worker_pool = worker_pool
+        # 앱 전체가 함께 쓰는 웹캠 관리자와 이모지 목록
+        self.camera_manager = camera_manager
+        self.emoji_registry = emoji_registry
+        # 게임 중에만 pool에서 빌려 쓰는 inference worker
+        self.worker = None
         self.video_thread = None
+        # capture 스레드의 프레임을 가장 최근 것만 GUI에 전달
+        self.frame_mailbox = FrameMailbox(flag['VIDEO_DISPLAY_FPS'], self)
+        self.frame_mailbox.frame_ready.connect(self.update_match)
 
-        EMOJI_DIR = "img/emoji"
-        try:
-            self.emotion_files = [
-                f for f in os.listdir(EMOJI_DIR)
-                if f.lower().endswith(('.png', '.jpg', '.jpeg')) and not f.startswith('.')
-            ]
-        except FileNotFoundError:
-            print(f"Error: 이모지 디렉토리 ({EMOJI_DIR})를 찾을 수 없습니다. 테스트 이모지 사용.")
-            self.emotion_files = ["0_placeholder.png"]
+        # 캡처한 프레임의 순위 계산 결과를 GUI 스레드를 막지 않고 기다리기 위한 타이머
+        self.ranking_timer = QTimer(self)
+        self.ranking_timer.timeout.connect(self.poll_ranking)
+        self.pending_seq = None
+        self.pending_frame_rgb = None
+        self.pending_elapsed_ms = 0
 
         self.initUI()
 
@@ -214,14 +214,14 @@ class Game2Screen(QWidget):
         center_h_layout.setAlignment(Qt.AlignCenter) 
 
         # 웹캠 피드 QLabel
-        self.video_label = QLabel(f'웹캠 피드 ({flag["VIDEO_WIDTH"]}x{flag["VIDEO_HEIGHT"]})')
+        self.video_label = VideoWidget(f'웹캠 피드 ({flag["VIDEO_WIDTH"]}x{flag["VIDEO_HEIGHT"]})')
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setFixedSize(flag['VIDEO_WIDTH'], flag['VIDEO_HEIGHT'])
         self.video_label.setStyleSheet("background-color: black; color: white;")
         
         # QStackedWidget 설정: 버튼과 이모지를 같은 위치에 전환
         self.emoji_stack = QStackedWidget()
-        stack_size = QSize(240, 240) 
+        stack_size = QSize(flag['EMOJI_IMAGE_SIZE'], flag['EMOJI_IMAGE_SIZE']) 
         self.emoji_stack.setFixedSize(stack_size)
         self.emoji_stack.setStyleSheet("background-color: transparent;")
 
@@ -366,33 +366,24 @@ class Game2Screen(QWidget):
 
         self.setLayout(main_layout)
 
-    def update_match(self, image):
+    def update_match(self, image, feed_index=0):
         """스레드에서 받은 웹캠 이미지를 업데이트합니다."""
         # 이 함수는 스트리밍 중에만 호출됩니다.
-        pixmap = QPixmap.fromImage(image)
-        self.video_label.setPixmap(pixmap)
-
-    def get_available_camera_index(self):
-        """사용 가능한 가장 낮은 인덱스의 웹캠 번호를 반환합니다."""
-        # 0부터 9까지 시도하며, 먼저 열리는 카메라의 인덱스를 반환
-        for index in range(10): 
-            cap = cv2.VideoCapture(index)
-            if cap.isOpened():
-                cap.release()
-                print(f"camera {index} available")
-                return index
-        return 0 # 찾지 못하면 기본값 0 반환
+        self.video_label.set_frame(image)
 
     def start_stream(self):
         self.stop_stream()
+        self.cancel_ranking()
+        if self.worker is None:
+            # 미리 모델을 로드해 둔 worker를 빌려옴
+            self.worker = self.worker_pool.acquire()
 
         self.video_thread = EmojiMatchThread(
-            camera_index=self.get_available_camera_index(),
-            all_emotion_files=self.emotion_files,
+            self.camera_manager,
             width=flag['VIDEO_WIDTH'],
             height=flag['VIDEO_HEIGHT']
         )
-        self.video_thread.change_pixmap_signal.connect(self.update_match)
+        self.video_thread.change_pixmap_signal.connect(self.frame_mailbox.post, Qt.DirectConnection)
         self.video_thread.start()
         print("이모지 매칭 스트리밍 시작")
         
@@ -406,13 +397,15 @@ class Game2Screen(QWidget):
         if self.video_thread and self.video_thread.isRunning():
             try:
                 # 시그널 연결 해제
-                self.video_thread.change_pixmap_signal.disconnect(self.update_match)
+                self.video_thread.change_pixmap_signal.disconnect(self.frame_mailbox.post)
             except Exception:
                 pass
 
             self.video_thread.stop()
             self.video_thread.wait() # 스레드가 완전히 종료될 때까지 대기
             self.video_thread = None
+            # 아직 그리지 않은 프레임이 캡처한 정지 화면을 덮어쓰지 않도록 버림
+            self.frame_mailbox.clear()
             print("이모지 매칭 스트리밍 종료")
             
     # 다시하기 버튼 클릭 시 호출될 메서드
@@ -428,6 +421,10 @@ class Game2Screen(QWidget):
 
     def go_to_main_menu(self):
         self.stop_stream()
+        self.cancel_ranking()
+        # worker는 종료하지 않고 pool에 반납
+        self.worker_pool.release(self.worker)
+        self.worker = None
         self.similarity_label.setText('📷 카메라 버튼을 눌러주세요! 찰칵~ 📷')
         self.stacked_widget.setCurrentIndex(0)
 
@@ -435,7 +432,7 @@ class Game2Screen(QWidget):
         """버튼 클릭 시 스트리밍을 멈추고 최종 프레임으로 유사도 계산을 수행합니다."""
         if self.video_thread and self.video_thread.isRunning():
             # 현재 스레드의 프레임 데이터 (OpenCV/NumPy) 가져오기
-            frame_to_process = self.video_thread.current_frame_rgb
+            frame_to_process = self.video_thread.current_frame
 
             # 스레드 멈추기
             self.stop_stream()
@@ -444,41 +441,60 @@ class Game2Screen(QWidget):
                 self.get_best_emoji(frame_to_process)
             else:
                 print("Warning: No frame captured to process.")
-        else:
+        elif self.pending_seq is None:
             self.start_stream()
 
-    def get_best_emoji(self, rgb_image):
-        try:
-            from compare import extract_blendshape_scores, compare_blendshape_scores
-            from person_in_frame import person_in_frame
-            import pandas as pd
-            import re
-            """캡처된 OpenCV 이미지로 유사도를 계산하고 GUI를 업데이트합니다."""
-            best_similarity = 0.0
-            best_match_emoji = self.emotion_files[0] if self.emotion_files else "0_angry.png"
-            bgr_image = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2BGR)
-            # 현재 frame의 blendshape값 계산
-            person = cv2.cvtColor(person_in_frame(bgr_image), cv2.COLOR_BGR2RGB)
-            blend1 = extract_blendshape_scores(person)
-
-            # 미리 저장된 blendshape 값 불러오기
-            features = pd.read_csv('faces.csv')
-            
-            # 유사도 계산 로직
-            for emoji_file in self.emotion_files:
-                try:
-                    label = int(re.sub(r'(\_)(\w+)(\.\w+)?$', '', emoji_file))
-                    feature = features[features["labels"] == label].values[0]
-                    blend2 = {features.keys()[i]: feature[i] for i in range(len(features.keys()))}
-                    similarity = compare_blendshape_scores(blend1, blend2)
-                    if similarity > best_similarity:
-                        best_similarity = similarity
-                        best_match_emoji = emoji_file
-                except Exception as e:
-                    print(f"Similarity calculation failed for {emoji_file}: {e}")
-                    continue
-        except:
-            print("유사도 검색 실패!")
+    def get_best_emoji(self, bgr_image):
+        """캡처된 이미지의 이모지 순위 계산을 worker에 요청하고, 결과는 poll_ranking에서 받습니다."""
+        self.pending_seq = self.worker.request_ranking(0, bgr_image)
+        # 결과 화면에 보여줄 정지 프레임은 한 번만 RGB로 변환
+        self.pending_frame_rgb = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2RGB)
+        self.pending_elapsed_ms = 0
+        self.similarity_label.setText('🔍 얼굴 분석 중... 🔍')
+        self.ranking_timer.start(self.RANKING_POLL_MS)
+
+    def poll_ranking(self):
+        """worker가 순위 계산을 끝냈는지 확인하고, 끝났으면 결과를 표시합니다."""
+        # worker가 모델 로드에 실패했으면 시간 초과까지 기다리지 않고 바로 알림
+        error = self.worker.failure() if self.worker else None
+        if error:
+            print(f"유사도 검색 실패! ({error})")
+            self.cancel_ranking()
+            self.similarity_label.setText('⚠️ 표정 인식 모델을 불러오지 못했습니다. 관리자에게 문의해 주세요. ⚠️')
+            return
+        ranking = self.worker.ranking(0, self.pending_seq) if self.worker else None
+        # 모델을 불러오는 동안은 시간 초과로 세지 않음
+        if self.worker and not self.worker.is_ready():
+            self.similarity_label.setText('⏳ 표정 인식 모델 준비 중... ⏳')
+            return
+        self.pending_elapsed_ms += self.RANKING_POLL_MS
+        if ranking is None and self.pending_elapsed_ms < self.RANKING_TIMEOUT_MS:
+            return
+        if ranking is None:
+            print("유사도 검색 실패! (시간 초과)")
+            ranking = []
+        rgb_image = self.pending_frame_rgb
+        self.cancel_ranking()
+        self.show_match_result(rgb_image, ranking)
+
+    def cancel_ranking(self):
+        self.ranking_timer.stop()
+        self.pending_seq = None
+        self.pending_frame_rgb = None
+
+    def show_match_result(self, rgb_image, ranking):
+        """
+        캡처된 프레임과 이모지 순위로 GUI를 업데이트하는 함수
+        Argv:
+            rgb_image (np.ndarray): 캡처된 RGB frame
+            ranking (list of tuple): (Emoji, 유사도 %) 리스트. 유사도 내림차순
+        """
+        best_similarity = 0.0
+        best_match_emoji = next(iter(self.emoji_registry), None)
+        runner_ups = []
+        if ranking:
+            best_match_emoji, best_similarity = ranking[0]
+            runner_ups = ranking[1:]
 
         # GUI 업데이트
         
@@ -495,20 +511,22 @@ class Game2Screen(QWidget):
         self.video_label.setPixmap(QPixmap.fromImage(p))
 
         # 추천 이모지 이미지 업데이트
-        file_path = os.path.join("img/emoji", best_match_emoji)
-        pixmap_emoji = QPixmap(file_path)
+        # 앱 시작 시 미리 디코딩/스케일링해 둔 이모지 사용
+        pixmap_emoji = best_match_emoji.pixmap(self.emoji_image.size()) if best_match_emoji else QPixmap()
         if not pixmap_emoji.isNull():
-            scaled_pixmap = pixmap_emoji.scaled(
-                self.emoji_image.size(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            self.emoji_image.setPixmap(scaled_pixmap)
+            self.emoji_image.setPixmap(pixmap_emoji)
             
             # QStackedWidget 설정: 이모지 보이기 (인덱스 1)
             self.emoji_stack.setCurrentIndex(1)
             # 다시하기 버튼 보이기
             self.retry_btn.show()
 
-        # 유사도 텍스트 업데이트
-        self.similarity_label.setText(f'🎉 얼굴 분석 결과... 추천해드린 이모지와 {best_similarity: .2f}% 닮으셨네요! 🎉')
\ No newline at end of file
+        # 유사도 텍스트 업데이트 (2위 이하 이모지도 함께 표시)
+        result_text = f'🎉 얼굴 분석 결과... 추천해드린 이모지와 {best_similarity: .2f}% 닮으셨네요! 🎉'
+        if runner_ups:
+            runner_up_text = ' / '.join(
+                f'{rank}위 {emoji.name} {similarity:.2f}%'
+                for rank, (emoji, similarity) in enumerate(runner_ups, start=2)
+            )
+            result_text += f'\n{runner_up_text}'
+        self.similarity_label.setText(result_text)
@@ -1,6 +1,4 @@
 import cv2
-import random
-import os
 import time
 from PyQt5.QtWidgets import (
     QWidget, QPushButton, QVBoxLayout, QLabel,
@@ -8,10 +6,9 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize, QPoint, QPointF
 from PyQt5.QtGui import QImage, QPixmap, QFont, QIcon, QMouseEvent, QPainter, QPainterPath, QColor, QCursor, QPen, QBrush
-from compare import calc_similarity
 from mainmenu import flag
 from back_button import create_main_menu_button
-from multiprocessing import Queue, Manager, Process
+from video_widget import FrameScaler, VideoWidget, FrameMailbox
 
 import numpy as np
 
@@ -93,54 +90,39 @@ class ClickableLabel(QLabel):
         self.unsetCursor()
         super().leaveEvent(event)
 
-# 유사도를 계산할 Worker함수
-# stop_event 인자를 추가합니다.
-def similarity_worker(item_queue, similarity_value, stop_event):
-    while True:
-        item = item_queue.get()
-        if item is None:
-            print("Queue empty!")
-            continue
-        # frame queue에 값이 들어올 때까지 대기
-        frame, emoji = item
-        if frame is None:
-            print(f"Worker terminated.")
-            break
-        try:
-            # 들어온 프레임으로 유사도 계산
-            similarity_value.value = 0 if emoji == "" else calc_similarity(frame, emoji)
-        except:
-            print("유사도 계산 실패!")
-
 # 웹캠 스트림 처리 스레드 (TimeAttack 모드 전용)
 class TimeAttackThread(QThread):
-    change_pixmap_signal = pyqtSignal(QImage)
+    # 화면 크기로 줄인 BGR frame을 보냄 (VideoWidget.set_frame으로 표시)
+    change_pixmap_signal = pyqtSignal(object)
     signal_ready = pyqtSignal()
 
-    def __init__(self, item_queue, camera_index, emotion_file, width=flag['VIDEO_WIDTH'], height=flag['VIDEO_HEIGHT']):
+    def __init__(self, channel, camera_manager, camera_index=None, emoji_id=None, width=flag['VIDEO_WIDTH'], height=flag['VIDEO_HEIGHT']):
         super().__init__()
+        self.camera_manager = camera_manager
         self.camera_index = camera_index
         self.running = True
         self.width = width
         self.height = height
-        self.emotion_file = emotion_file
+        # 비교할 이모지 id. None이면 worker에 프레임을 보내지 않음
+        self.emoji_id = emoji_id
         self.frame_count = 0
         self.inference_interval = 3
-        self.item_queue = item_queue
+        self.channel = channel
+        self.scaler = FrameScaler(width, height)
 
-    def set_emotion_file(self, new_emotion_file):
-        self.emotion_file = new_emotion_file
+    def set_emoji_id(self, new_emoji_id):
+        self.emoji_id = new_emoji_id
 
     def run(self):
-        cap = cv2.VideoCapture(self.camera_index)
-        if not cap.isOpened():
+        # 웹캠 번호를 받지 않았으면 찾은 웹캠 중 첫 번째를 사용 (목록을 찾는 중이면 이 스레드에서 기다림)
+        if self.camera_index is None:
+            self.camera_index = self.camera_manager.camera_indexes(1)[0]
+        # 웹캠은 CameraManager가 열어 두고 관리하므로 여기서 열거나 닫지 않음
+        cap = self.camera_manager.open(self.camera_index)
+        if cap is None:
             print(f"Error: Could not open camera {self.camera_index}.")
             self.running = False
             return
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
-        TARGET_FPS = 30.0
-        cap.set(cv2.CAP_PROP_FPS, TARGET_FPS)
 
         self.signal_ready.emit()
 
@@ -148,20 +130,13 @@ class TimeAttackThread(QThread):
             ret, frame = cap.read()
             if ret:
                 self.frame_count += 1
-                if self.frame_count % self.inference_interval == 0:
-                    self.item_queue.put((frame, self.emotion_file))
-                rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb_image.shape
-                bytes_per_line = ch * w
-                convert_to_Qt_format = QImage(
-                    rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888
-                )
-                p = convert_to_Qt_format.scaled(self.width, self.height, Qt.KeepAspectRatio)
-
-                self.change_pixmap_signal.emit(p)
+                if self.emoji_id is not None and self.frame_count % self.inference_interval == 0:
+                    # 프레임은 shared memory에 쓰고, worker가 밀려 있으면 이전 프레임은 버림
+                    # (이모지와의 비교는 worker가 아니라 GUI 쪽에서 함)
+                    self.channel.put(frame)
+                # 색 변환 없이 미리 할당한 버퍼에 화면 크기로 줄여서 보냄
+                self.change_pixmap_signal.emit(self.scaler.scale(frame))
             self.msleep(50)
-        if cap.isOpened():
-             cap.release()
 
     def stop(self):
         self.running = False
@@ -306,28 +281,28 @@ class Result3screen(QWidget):
 # 게임 3 GUI
 class Game3Screen(QWidget):
     game_finished = pyqtSignal(int)
-    def __init__(self, stacked_widget):
+    def __init__(self, stacked_widget, worker_pool, camera_manager, emoji_registry):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.worker_pool = worker_pool
+        # 앱 전체가 함께 쓰는 웹캠 관리자
+        self.camera_manager = camera_manager
+        # 앱 전체가 함께 쓰는 이모지 목록
+        self.emoji_registry = emoji_registry
+        # 게임 중에만 pool에서 빌려 쓰는 inference worker
+        self.worker = None
         self.video_thread = None
-        self.EMOJI_DIR = "img/emoji"
-        # FileNotFoundError 처리를 여기서 진행하지 않고 원본 코드 구조 유지
-        self.emotion_files = [
-            f for f in os.listdir(self.EMOJI_DIR)
-            if f.lower().endswith(('.png', '.jpg', '.jpeg')) and not f.startswith('.')
-        ]
-
-         # Manager 객체를 인스턴스 멤버 변수로 선언하여 AttributeError 해결
-        self.manager = Manager() 
-        
-        # self.manager를 사용하여 공유 값 및 Queue를 생성
-        self.current_accuracy = self.manager.Value(float, 0.0)
-        
-        self.current_emotion_file = ""
+        # capture 스레드의 프레임을 가장 최근 것만 GUI에 전달
+        self.frame_mailbox = FrameMailbox(flag['VIDEO_DISPLAY_FPS'], self)
+        self.frame_mailbox.frame_ready.connect(self.update_image_and_score)
+
+        # 현재 목표 이모지 id (없으면 None)
+        self.current_emoji_id = None
         self.total_score = 0
         self.target_similarity = 70.0
         self.is_transitioning = False
-        self.transition_delay_ms  = 2000
+        # 목표가 바뀌면 이전 이모지의 결과는 epoch 번호로 걸러지므로 오래 기다리지 않아도 됨
+        self.transition_delay_ms  = 1000
         self.pass_delay_ms  = 500
         self.total_game_time = 30
         self.time_left = self.total_game_time
@@ -335,14 +310,6 @@ class Game3Screen(QWidget):
         self.game_timer.timeout.connect(self.update_timer)
         self.game_started = False
 
-        # 유사도 계산을 위한 worker와 queue
-        self.similarity_worker = None
-        # self.manager.Queue()를 사용하여 프로세스 간 통신을 확보
-        self.item_queue = self.manager.Queue() 
-        
-        # 클린 종료를 위한 이벤트 객체 추가
-        self.stop_event = self.manager.Event() 
-
 
 
         # 성공 이미지 오버레이 관련 멤버 변수
@@ -442,7 +409,7 @@ class Game3Screen(QWidget):
 
         self.emotion_label = QLabel("표정 이미지 준비 중...")
         self.emotion_label.setAlignment(Qt.AlignCenter)
-        self.emotion_label.setFixedSize(240, 240)
+        self.emotion_label.setFixedSize(flag['EMOJI_IMAGE_SIZE'], flag['EMOJI_IMAGE_SIZE'])
         self.emotion_label.setStyleSheet("border: 0px solid #ccc; background-color: #f0f0f0;")
         self.center_widget = QWidget()
         center_stack_layout = QStackedWidget(self.center_widget)
@@ -510,7 +477,7 @@ class Game3Screen(QWidget):
         )
 
         # Video Label
-        self.video_label = QLabel(f"웹캠 피드 ({flag['VIDEO_WIDTH']}x{flag['VIDEO_HEIGHT']})")
+        self.video_label = VideoWidget(f"웹캠 피드 ({flag['VIDEO_WIDTH']}x{flag['VIDEO_HEIGHT']})")
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setFixedSize(flag['VIDEO_WIDTH'], flag['VIDEO_HEIGHT'])
         self.video_label.setStyleSheet("background-color: black; color: white;")
@@ -547,7 +514,7 @@ class Game3Screen(QWidget):
         # self.current_accuracy_label 폰트 대체 적용
         font_current_acc = QFont('Jalnan Gothic', 25)
         font_current_acc.setFamilies(['Jalnan Gothic', 'Jalnan Gothic TTF'])       
-        self.current_accuracy_label = QLabel(f'현재 유사도: {self.current_accuracy.value: .2f}%')
+        self.current_accuracy_label = QLabel(f'현재 유사도: {0.00: .2f}%')
         self.current_accuracy_label.setFont(font_current_acc)
         self.current_accuracy_label.setStyleSheet("background-color: 'transparent'; color: #292E32; padding-top: 15px;")
         self.current_accuracy_label.setAlignment(Qt.AlignCenter)
@@ -606,25 +573,28 @@ class Game3Screen(QWidget):
         self.game_timer.start(1000)
 
     def set_next_emotion(self):
-        if not self.emotion_files: return
-        available_emotions = [f for f in self.emotion_files if f != self.current_emotion_file]
-        if not available_emotions: available_emotions = self.emotion_files
-        self.current_emotion_file = random.choice(available_emotions)
+        # 직전 이모지를 제외하고 무작위로 고름
+        next_emoji_id = self.emoji_registry.random_id(exclude=self.current_emoji_id)
+        if next_emoji_id is None: return
+        self.current_emoji_id = next_emoji_id
+        emoji = self.emoji_registry[self.current_emoji_id]
         
         #video_thread가 none인지 확인
         if self.video_thread:
-            self.video_thread.set_emotion_file(self.current_emotion_file)
+            self.video_thread.set_emoji_id(self.current_emoji_id)
         
         
-        file_path = os.path.join(self.EMOJI_DIR, self.current_emotion_file)
-        pixmap = QPixmap(file_path)
+        # 앱 시작 시 미리 디코딩/스케일링해 둔 이모지를 사용해 전환할 때 멈추지 않도록 함
+        pixmap = emoji.pixmap(self.emotion_label.size())
         if pixmap.isNull():
-            self.emotion_label.setText(f"이미지 없음: {self.current_emotion_file}")
+            self.emotion_label.setText(f"이미지 없음: {emoji.file_name}")
         else:
-            scaled_pixmap = pixmap.scaled(self.emotion_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.emotion_label.setPixmap(scaled_pixmap)
+            self.emotion_label.setPixmap(pixmap)
         if self.video_thread and self.video_thread.isRunning():
-            self.video_thread.set_emotion_file(self.current_emotion_file)
+            self.video_thread.set_emoji_id(self.current_emoji_id)
+        # worker에 다시 보낼 필요 없이 다음 특징 벡터부터 새 이모지와 비교됨
+        if self.worker:
+            self.worker.set_target(0, self.current_emoji_id)
 
     def pass_emotion(self):
         """
@@ -664,62 +634,46 @@ class Game3Screen(QWidget):
     def hide_success_overlay(self):
         self.success_overlay.hide()
 
-    def update_image_and_score(self, image):
+    def update_image_and_score(self, image, feed_index=0):
         if not self.is_transitioning:
-            pixmap = QPixmap.fromImage(image)
-            self.video_label.setPixmap(pixmap)
-            self.current_accuracy_label.setText(f'현재 유사도: {self.current_accuracy.value: .2f}%')
-            if self.current_accuracy.value >= self.target_similarity:
+            self.video_label.set_frame(image)
+            # worker가 아직 모델을 불러오는 중이거나 실패했으면 0% 대신 상태를 표시
+            status = self.worker.status_text() if self.worker else None
+            if status:
+                self.current_accuracy_label.setText(f'현재 유사도: {status}')
+                return
+            current_accuracy = self.worker.similarity(0) if self.worker else 0.0
+            self.current_accuracy_label.setText(f'현재 유사도: {current_accuracy: .2f}%')
+            if current_accuracy >= self.target_similarity:
                 self.is_transitioning = True
                 self.total_score += 1
                 self.score_label.setText(f"SCORE: {self.total_score}")
-                self.video_thread.emotion_file = ""
-                while not self.item_queue.empty():
-                    try:
-                        self.item_queue.get_nowait()
-                    except:
-                        break
+                self.video_thread.emoji_id = None
+                # epoch를 올려 성공 전에 보낸 프레임의 결과가 다음 이모지 점수로 쓰이지 않도록 함
+                self.worker.set_target(0, None)
                 self.show_success_overlay()
                 QTimer.singleShot(self.transition_delay_ms, self.complete_transition)
 
     def complete_transition(self):
         self.set_next_emotion()
-        self.current_accuracy.value = 0.0
         self.video_label.setStyleSheet("border: none;")
         self.is_transitioning = False
 
-    def get_available_camera_index(self):
-        for index in range(10):
-            cap = cv2.VideoCapture(index)
-            if cap.isOpened():
-                cap.release()
-                return index
-        return 0
-
-    def start_similarity_worker(self):
-        if not self.similarity_worker:
-            self.stop_event.clear() # 새 게임 시작 전 이벤트 초기화 (보험용)
-            # stop_event를 인자로 전달하여 클린 종료를 지원
-            self.similarity_worker = Process(target=similarity_worker, args=(self.item_queue, self.current_accuracy, self.stop_event)) 
-        if self.similarity_worker and not self.similarity_worker.is_alive():
-            self.similarity_worker.start()
-        self.video_thread.signal_ready.disconnect(self.start_similarity_worker)
-        
-
     def start_stream(self):
         self.stop_stream()
-        self.current_emotion_file = ""
+        self.current_emoji_id = None
         self.total_score = 0
         self.score_label.setText(f"SCORE: {self.total_score}")
+        # 미리 모델을 로드해 둔 worker를 빌려옴
+        self.worker = self.worker_pool.acquire()
         self.video_thread = TimeAttackThread(
-            item_queue=self.item_queue,
-            camera_index=self.get_available_camera_index(),
-            emotion_file=self.current_emotion_file,
+            channel=self.worker.channels[0],
+            camera_manager=self.camera_manager,
+            emoji_id=self.current_emoji_id,
             width=flag['VIDEO_WIDTH'],
             height=flag['VIDEO_HEIGHT']
         )
-        self.video_thread.change_pixmap_signal.connect(self.update_image_and_score)
-        self.video_thread.signal_ready.connect(self.start_similarity_worker)
+        self.video_thread.change_pixmap_signal.connect(self.frame_mailbox.post, Qt.DirectConnection)
         self.video_thread.start()
 
     def stop_stream(self):
@@ -727,23 +681,16 @@ class Game3Screen(QWidget):
             self.game_timer.stop()
         if self.video_thread and self.video_thread.isRunning():
             try:
-                self.video_thread.change_pixmap_signal.disconnect(self.update_image_and_score)
+                self.video_thread.change_pixmap_signal.disconnect(self.frame_mailbox.post)
             except Exception: pass
             self.video_thread.stop()
             self.video_thread.wait()
             self.video_thread = None
-            
-        # 클린 종료 로직 적용: None 신호를 큐에 넣어 worker를 깨우고 종료
-        if self.similarity_worker and self.similarity_worker.is_alive():
-            # 큐에 None 신호를 넣어 blocking된 worker를 깨우고 exit합니다.
-            self.item_queue.put((None, None))
-            # worker가 종료되기를 기다립니다. (timeout 1초)
-            self.similarity_worker.join(timeout=1) 
-            # 1초 후에도 살아있다면 강제 종료 (보험)
-            if self.similarity_worker.is_alive():
-                self.similarity_worker.terminate()
-                
-        self.similarity_worker = None #None 처리 필수
+        self.frame_mailbox.clear()
+
+        # worker는 종료하지 않고 pool에 반납
+        self.worker_pool.release(self.worker)
+        self.worker = None
 
     def showEvent(self, event):
         super().showEvent(event)
@@ -759,19 +706,12 @@ class Game3Screen(QWidget):
         self.pass_button.hide()
         self.score_label.setText(f"SCORE: {0}")
         self.current_accuracy_label.setText(f'현재 유사도: {0.00: .2f}%')
-        self.current_accuracy.value = 0.0
         self.video_label.setText(f"웹캠 피드 ({flag['VIDEO_WIDTH']}x{flag['VIDEO_HEIGHT']})")
-        self.current_emotion_file = ""
+        self.current_emoji_id = None
         self.video_label.setPixmap(QPixmap())
-        
-        # 클린 종료 로직 적용
-        if self.similarity_worker and self.similarity_worker.is_alive():
-            self.item_queue.put((None, None))
-            self.similarity_worker.join(timeout=1)
-            if self.similarity_worker.is_alive():
-                self.similarity_worker.terminate()
-                
-        self.similarity_worker = None #None 처리 필수
+
+        self.worker_pool.release(self.worker)
+        self.worker = None
 
     def go_to_result_screen(self):
         self.stacked_widget.setCurrentIndex(5)
@@ -779,4 +719,4 @@ class Game3Screen(QWidget):
     def go_to_main_menu(self):
         self.stop_stream()
         self.reset_game_state()
-        self.stacked_widget.setCurrentIndex(0)
\ No newline at end of file
+        self.stacked_widget.setCurrentIndex(0)
@@ -0,0 +1,153 @@
+import traceback
+import time
+from queue import Empty
+import compare
+import person_in_frame
+from compare import extract_frame_vectors, LandmarkerSession
+from person_tracker import PersonTracker
+from model_registry import MODEL_CONFIG
+
+# 프레임이 하나도 없을 때 첫 채널에서 기다리는 시간 (초)
+POLL_TIMEOUT = 0.02
+# 같은 시점(pair)의 프레임이 나머지 채널에 도착하기를 기다리는 최대 시간 (초)
+PAIR_TIMEOUT = 0.05
+# pair를 기다리는 동안 채널 하나를 확인하는 시간 (초)
+PAIR_POLL = 0.005
+
+def latest_pair(batch):
+    """
+    모은 프레임 중 가장 최근 pair와 그 pair로 이미 모은 프레임 수를 구하는 함수
+    Returns:
+        Tuple: ((pair 번호, 함께 보낸 프레임 수), 모은 프레임 수). pair가 붙은 프레임이 없으면 (None, 0)
+    """
+    pairs = [item[3] for item in batch.values() if item[3] is not None]
+    if not pairs:
+        return None, 0
+    pair = max(pairs)
+    return pair, sum(item[3] == pair for item in batch.values())
+
+def collect_latest_frames(channels):
+    """
+    모든 채널에서 대기 중인 최신 프레임을 모으는 함수
+    pair가 붙은 프레임을 받으면, 같은 pair의 프레임이 다른 채널에도 모두 도착할 때까지 (최대 PAIR_TIMEOUT)
+    기다렸다가 함께 반환하므로 두 플레이어의 프레임이 같은 batch로 추론됨.
+    기다리는 동안 더 새로운 pair가 오면 그 pair를 기준으로 다시 맞추고, 시간이 지나면 모은 만큼만 반환함.
+    Argv:
+        channels (list of LatestFrameChannel): 플레이어 순서대로의 채널 리스트
+
+    Returns:
+        List of tuple: (플레이어 번호, 시퀀스 번호, BGR frame, epoch 번호) 리스트
+                       종료 신호를 받은 경우 None 반환
+    """
+    # 플레이어 번호 -> (시퀀스 번호, BGR frame, epoch 번호, pair)
+    batch = {}
+    for player_index, channel in enumerate(channels):
+        try:
+            # 아직 모은 프레임이 없으면 잠깐 기다리고, 있으면 기다리지 않고 확인만 함
+            item = channel.get(timeout=0 if batch else POLL_TIMEOUT)
+        except Empty:
+            continue
+        if item is None:
+            return None
+        batch[player_index] = item
+
+    deadline = time.monotonic() + PAIR_TIMEOUT
+    pair, count = latest_pair(batch)
+    while pair is not None and count < pair[1]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        # 아직 이 pair의 프레임이 없는 채널을 돌아가며 확인
+        for player_index, channel in enumerate(channels):
+            if player_index in batch and batch[player_index][3] == pair:
+                continue
+            try:
+                item = channel.get(timeout=min(remaining, PAIR_POLL))
+            except Empty:
+                continue
+            if item is None:
+                return None
+            batch[player_index] = item
+            break
+        pair, count = latest_pair(batch)
+    return [(player_index, seq, frame, epoch) for player_index, (seq, frame, epoch, _) in sorted(batch.items())]
+
+def warmup(sessions, width, height):
+    """
+    첫 프레임이 늦게 처리되지 않도록 모델을 로드하고 빈 프레임으로 한 번씩 돌려두는 함수
+    'direct' 모드는 얼굴을 못 찾은 프레임에만 YOLO를 쓰므로 YOLO는 미리 로드하지 않고,
+    잘라낸 이미지를 처리할 IMAGE 모드 landmarker만 함께 로드함.
+    """
+    if MODEL_CONFIG['pipeline_mode'] == 'detect':
+        person_in_frame.warmup(width, height, batch=len(sessions))
+    else:
+        compare.warmup()
+    for session in sessions:
+        compare.warmup(session)
+
+# 여러 플레이어의 표정 특징을 한 프로세스에서 추출할 inference server 함수
+def inference_server(channels, results, ready_event, errors):
+    """
+    여러 웹캠의 프레임을 받아 YOLO를 한 번의 batch로 돌리고 플레이어별 표정 특징 벡터를 저장하는 함수
+    모델은 이 프로세스에서 한 번만 로드되므로 플레이어 수만큼 모델 메모리가 늘어나지 않음.
+    이모지와의 비교는 하지 않으므로, 목표 이모지가 바뀌어도 처리 중인 프레임이 낭비되지 않음.
+    단, 목표 epoch가 바뀌기 전에 보낸 프레임은 추론하지 않거나 결과를 쓰지 않음 (이전 목표의 표정이므로).
+    앱이 종료될 때까지 살아 있으며, 채널로 종료 신호를 받으면 끝남.
+    Argv:
+        channels (list of LatestFrameChannel): 플레이어 순서대로의 프레임 채널
+        results (VectorBlock): 플레이어별 최신 특징 벡터와 프레임 시퀀스 번호를 쓰는 shared memory
+        ready_event (multiprocessing.Event): 모델 로드와 warm-up이 끝나면 set
+        errors (multiprocessing.Queue): 모델 로드에 실패하면 실패 이유(str)를 넣고 프로세스를 끝냄
+    """
+    # 플레이어(카메라)마다 얼굴을 따로 추적하도록 VIDEO 모드 세션을 하나씩 생성
+    sessions = [LandmarkerSession() for _ in channels]
+    # 플레이어마다 사람 박스를 재사용해 YOLO 실행 횟수를 줄임
+    trackers = [PersonTracker() for _ in channels]
+    try:
+        warmup(sessions, channels[0].frames.width, channels[0].frames.height)
+        names, _ = compare.load_references()
+    except Exception as e:
+        # 조용히 죽지 않고 GUI가 화면에 표시할 수 있도록 실패 이유를 전달
+        traceback.print_exc()
+        errors.put(f"모델을 불러오지 못했습니다: {e}")
+        for session in sessions:
+            session.close()
+        return
+    if len(names) != results.vector_size:
+        print(f"경고: 참조값의 특징 수({len(names)})가 결과 블록의 벡터 크기({results.vector_size})와 다릅니다.")
+    ready_event.set()
+    print("Inference server ready")
+
+    while True:
+        batch = collect_latest_frames(channels)
+        if batch is None:
+            dropped = [channel.dropped for channel in channels]
+            detections = [tracker.detections for tracker in trackers]
+            print(f"Inference server terminated. (dropped frames: {dropped}, YOLO runs: {detections})")
+            break
+        if not batch:
+            continue
+        # YOLO가 필요한 프레임은 extract_frame_vectors 안에서 한 번의 batch로 처리
+        try:
+            vectors = extract_frame_vectors(
+                [frame for _, _, frame, _ in batch],
+                [sessions[player_index] for player_index, _, _, _ in batch],
+                trackers=[trackers[player_index] for player_index, _, _, _ in batch],
+            )
+        except:
+            print("표정 인식 실패!")
+            vectors = [None] * len(batch)
+
+        for (player_index, seq, _, epoch), vector in zip(batch, vectors):
+            # 추론하는 동안 GUI가 목표를 바꿨으면 이전 목표의 결과는 쓰지 않고 버림
+            if epoch != channels[player_index].epoch:
+                continue
+            if vector is not None and len(vector) != results.vector_size:
+                vector = None
+            results.write_vector(player_index, seq, epoch, vector)
+
+    for session in sessions:
+        session.close()
+    for channel in channels:
+        channel.close()
+    results.close()
@@ -6,20 +6,31 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QVBoxLayout, QLabel, 
     QHBoxLayout, QStackedWidget, QMainWindow
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt5.QtGui import QImage, QPixmap, QFont
 from game1 import Game1Screen, Resultscreen
 from game2 import Game2Screen
 from game3 import Game3Screen, Result3screen
 from mainmenu  import MainMenu
+from worker_pool import WorkerPool
+from camera_manager import CameraManager
+from asset_cache import preload_game_assets
+from emoji_registry import EmojiRegistry
+from emoji_watcher import EmojiWatcher
 import multiprocessing
 
 # ----------------------------------------------------------------------
 # 5. 앱 전환기 역할을 하는 메인 윈도우
 # ----------------------------------------------------------------------
 class AppSwitcher(QMainWindow):
-    def __init__(self):
+    def __init__(self, worker_pool, camera_manager, emoji_registry):
         super().__init__()
+        self.worker_pool = worker_pool
+        self.camera_manager = camera_manager
+        # 모든 화면과 worker가 함께 쓰는 이모지 목록
+        self.emoji_registry = emoji_registry
+        # 이모지와 디자인 이미지는 메인 메뉴를 띄우는 동안 백그라운드에서 미리 디코딩
+        preload_game_assets(self.emoji_registry)
         self.init_ui()
 
     def init_ui(self):
@@ -33,21 +44,9 @@ class AppSwitcher(QMainWindow):
 
         self.stacked_widget = QStackedWidget()
         
-        # 각 화면 인스턴스 생성
+        # 메인 메뉴를 먼저 띄우고, 나머지 화면과 inference worker는 이벤트 루프가 시작된 뒤 준비
         self.main_menu = MainMenu(self.stacked_widget)         # mainmenu 인스턴스
-        self.game1_screen = Game1Screen(self.stacked_widget)   # game1Screen 인스턴스 
-        self.result1_screen = Resultscreen(self.stacked_widget) # game1Result 
-        self.game2_screen = Game2Screen(self.stacked_widget)   # game2Screen 인스턴스
-        self.game3_screen = Game3Screen(self.stacked_widget)   # game3Screen 인스턴스
-        self.result3_screen = Result3screen(self.stacked_widget)   # game3Result 인스턴스
-        
-        # QStackedWidget에 화면 추가 (인덱스 순서)
         self.stacked_widget.addWidget(self.main_menu)         # Index 0
-        self.stacked_widget.addWidget(self.game1_screen)      # Index 1
-        self.stacked_widget.addWidget(self.result1_screen)    # Index 2
-        self.stacked_widget.addWidget(self.game2_screen)      # Index 3
-        self.stacked_widget.addWidget(self.game3_screen)      # Index 4
-        self.stacked_widget.addWidget(self.result3_screen)    # Index 5
         
         # 메인 윈도우에 QStackedWidget 설정
         central_widget = QWidget()
@@ -59,9 +58,40 @@ class AppSwitcher(QMainWindow):
 
         main_layout.addWidget(self.stacked_widget)
         self.setCentralWidget(central_widget)
+
+        QTimer.singleShot(0, self.init_game_screens)
+
+    def init_game_screens(self):
+        # 모델 로드와 warm-up은 worker 프로세스에서 진행되므로 GUI는 멈추지 않음
+        self.worker_pool.start()
+        # 웹캠 목록을 백그라운드에서 미리 찾아 두어 게임을 시작할 때 기다리지 않도록 함
+        self.camera_manager.discover()
+
+        # 각 화면 인스턴스 생성
+        self.game1_screen = Game1Screen(self.stacked_widget, self.worker_pool, self.camera_manager, self.emoji_registry)   # game1Screen 인스턴스 
+        self.result1_screen = Resultscreen(self.stacked_widget) # game1Result 
+        self.game2_screen = Game2Screen(self.stacked_widget, self.worker_pool, self.camera_manager, self.emoji_registry)   # game2Screen 인스턴스
+        self.game3_screen = Game3Screen(self.stacked_widget, self.worker_pool, self.camera_manager, self.emoji_registry)   # game3Screen 인스턴스
+        self.result3_screen = Result3screen(self.stacked_widget)   # game3Result 인스턴스
+        
+        # QStackedWidget에 화면 추가 (인덱스 순서)
+        self.stacked_widget.addWidget(self.game1_screen)      # Index 1
+        self.stacked_widget.addWidget(self.result1_screen)    # Index 2
+        self.stacked_widget.addWidget(self.game2_screen)      # Index 3
+        self.stacked_widget.addWidget(self.game3_screen)      # Index 4
+        self.stacked_widget.addWidget(self.result3_screen)    # Index 5
+
+        # 앱 실행 중 이모지/사람 이미지가 추가되거나 바뀌면 재시작 없이 반영
+        self.emoji_watcher = EmojiWatcher(self.emoji_registry, parent=self)
+        self.emoji_watcher.start()
         
-        # 웹캠 스레드 정리
+        # 웹캠 스레드 정리 후 inference worker와 웹캠 종료
+        QApplication.instance().aboutToQuit.connect(self.emoji_watcher.stop)
         QApplication.instance().aboutToQuit.connect(self.game1_screen.stop_video_streams)
+        QApplication.instance().aboutToQuit.connect(self.game2_screen.stop_stream)
+        QApplication.instance().aboutToQuit.connect(self.game3_screen.stop_stream)
+        QApplication.instance().aboutToQuit.connect(self.worker_pool.shutdown)
+        QApplication.instance().aboutToQuit.connect(self.camera_manager.shutdown)
         
     def closeEvent(self, event):
         """메인 창이 닫힐 때 모든 스레드를 안전하게 종료합니다."""
@@ -77,7 +107,11 @@ if __name__ == '__main__':
         multiprocessing.set_start_method('spawn', force=True)
     except RuntimeError:
         pass
+    # 이모지 폴더는 앱 시작 시 한 번만 읽음
+    emoji_registry = EmojiRegistry()
+    worker_pool = WorkerPool(emoji_registry)
+    camera_manager = CameraManager()
     app = QApplication(sys.argv)
-    ex = AppSwitcher()
+    ex = AppSwitcher(worker_pool, camera_manager, emoji_registry)
     ex.show()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -15,6 +15,8 @@ flag = {
 
     'VIDEO_WIDTH': 500,
     'VIDEO_HEIGHT': 370,
+    # 웹캠 영상을 화면에 다시 그리는 최대 FPS (모니터 주사율보다 높으면 주사율을 따름)
+    'VIDEO_DISPLAY_FPS': 30,
 
     'BUTTON_WIDTH': 402,
     'BUTTON_HEIGHT': 410,
@@ -32,6 +34,9 @@ flag = {
     'BUTTON_EXIT_X': 1771, 
     'BUTTON_EXIT_Y': 959, 
     'SCORE_IMAGE_SIZE': 100,
+    'EMOJI_IMAGE_SIZE': 240,
+    # 앱 실행 중 이모지/사람 이미지 폴더가 바뀌었는지 확인하는 주기 (ms)
+    'EMOJI_RELOAD_INTERVAL_MS': 2000,
 
     'BACKGROUND_IMAGE_PATH': 'design/page_main.png',
     'BUTTON_EXIT_IMAGE_PATH': 'design/exit.png',
@@ -0,0 +1,156 @@
+import os
+import hashlib
+import pathlib
+from contextlib import contextmanager
+
+# 프로젝트 폴더 (모델 파일은 모두 이 폴더에 둠)
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 사용할 모델 설정. 모델 파일은 네트워크에서 받아오지 않으므로 모두 로컬 파일이어야 함.
+# (yolov5 코드만 로컬 저장소가 없을 때 torch.hub로 한 번 받아 캐시해 둠. README.md 참고)
+# 설치 환경마다 다르게 쓰고 싶으면 환경 변수로 바꿀 수 있음
+MODEL_CONFIG = {
+    # 사람 검출 모델 (MODELS에 등록된 파일 이름)
+    'person_detector': os.environ.get('MOZI_PERSON_MODEL', 'yolov5n.pt'),
+    # 사람 검출 backend: 'torch', 'onnxruntime', 'opencv' (person_detector.py 참고)
+    'detector_backend': os.environ.get('MOZI_DETECTOR_BACKEND', 'torch'),
+    # 표정 추출 방식
+    # 'direct': 프레임을 바로 landmarker에 넣고, 얼굴을 못 찾은 프레임만 YOLO로 사람을 잘라 다시 시도
+    # 'detect': 항상 YOLO로 사람을 잘라낸 뒤 landmarker에 넣음
+    'pipeline_mode': os.environ.get('MOZI_PIPELINE_MODE', 'direct'),
+    # 이모지 하나에 참조 얼굴이 여러 장일 때 라벨 점수를 구하는 방식 (reference_index.py 참고)
+    'reference_reduction': os.environ.get('MOZI_REFERENCE_REDUCTION', 'max'),
+    'reference_top_k': int(os.environ.get('MOZI_REFERENCE_TOP_K', '3')),
+    # 얼굴 특징점/blendshape 모델
+    'face_landmarker': os.environ.get('MOZI_FACE_MODEL', 'face_landmarker.task'),
+    # yolov5 체크포인트를 불러올 때 쓰는 ultralytics/yolov5 저장소를 clone해 둔 폴더
+    # ex) git clone https://github.com/ultralytics/yolov5 (설치 시 한 번만)
+    'yolov5_repo': os.environ.get('MOZI_YOLOV5_REPO', os.path.join(MODEL_DIR, 'yolov5')),
+    # 위 폴더가 없을 때 대신 사용할 torch.hub 저장소 (ex. 'ultralytics/yolov5')
+    # torch.hub는 불러올 때마다 GitHub에 접속할 수 있으므로 기본값은 비워 두어 네트워크를 쓰지 않음 (직접 지정할 때만 사용)
+    'yolov5_hub': os.environ.get('MOZI_YOLOV5_HUB', ''),
+}
+
+# 등록된 모델 파일과 sha256. 파일이 바뀌면 여기 값도 함께 바꿔야 함
+MODELS = {
+    'yolov5n.pt': {
+        'format': 'yolov5',
+        'person_class': 0,
+        'sha256': '4f180cf23ba0717ada0badd6c685026d73d48f184d00fc159c2641284b2ac0a3',
+    },
+    'best.pt': {
+        'format': 'yolov5',
+        'person_class': 0,
+        'sha256': '8cd35c18d66e8abe42ac7d66552abf25c2d9c962fb033c9d10b8c981569febde',
+    },
+    'last.pt': {
+        'format': 'yolov5',
+        'person_class': 0,
+        'sha256': '1d18581d0c36506b366e56be73ff7c8702f5d4a6619ec311838930aba2d69557',
+    },
+    'face_landmarker.task': {
+        'format': 'mediapipe',
+        'sha256': '64184e229b263107bc2b804c6625db1341ff2bb731874b0bcc2fe6544e0bc9ff',
+    },
+}
+
+# 이미 확인한 파일은 다시 해시를 계산하지 않음. {경로: (크기, 수정 시각)}
+_verified = {}
+
+def sha256sum(path, chunk_size=1 << 20):
+    """파일의 sha256 값을 16진수 문자열로 반환합니다."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def resolve(name):
+    """
+    등록된 모델 이름을 로컬 파일 경로로 바꾸고 sha256을 확인하는 함수
+    Argv:
+        name (str): MODELS에 등록된 모델 파일 이름. ex) "yolov5n.pt"
+
+    Returns:
+        Str: 모델 파일의 절대 경로
+             등록되지 않은 모델이면 KeyError, 파일이 없으면 FileNotFoundError,
+             해시가 다르면 ValueError 발생
+    """
+    if name not in MODELS:
+        raise KeyError(f"등록되지 않은 모델입니다: {name} (등록된 모델: {', '.join(MODELS)})")
+    path = os.path.join(MODEL_DIR, name)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"모델 파일이 없습니다: {path}")
+
+    stat = os.stat(path)
+    if _verified.get(path) != (stat.st_size, stat.st_mtime_ns):
+        actual = sha256sum(path)
+        expected = MODELS[name]['sha256']
+        if actual != expected:
+            raise ValueError(f"모델 파일의 sha256이 다릅니다: {path}\n  expected {expected}\n  actual   {actual}")
+        _verified[path] = (stat.st_size, stat.st_mtime_ns)
+    return path
+
+@contextmanager
+def _posix_checkpoint_paths():
+    """
+    리눅스에서 저장된 체크포인트에는 pathlib.PosixPath가 pickle되어 있어
+    윈도우에서는 불러올 수 없으므로, 불러오는 동안에만 WindowsPath로 바꿔 둠.
+    윈도우가 아니면 아무것도 하지 않음.
+    """
+    if os.name != 'nt':
+        yield
+        return
+    posix_path = pathlib.PosixPath
+    pathlib.PosixPath = pathlib.WindowsPath
+    try:
+        yield
+    finally:
+        pathlib.PosixPath = posix_path
+
+def load_yolov5(name=None, device='cpu'):
+    """
+    yolov5 형식의 체크포인트를 yolov5 저장소 코드로 불러오는 함수
+    MODEL_CONFIG['yolov5_repo']에 clone해 둔 저장소를 네트워크 없이 사용함.
+    저장소가 없으면 바로 FileNotFoundError를 발생시켜 호출한 쪽이 OpenCV(ONNX) 검출기로 대신하도록 함.
+    MODEL_CONFIG['yolov5_hub']를 지정한 경우에만 torch.hub로 불러옴 (네트워크 사용).
+    Argv:
+        name (str): MODELS에 등록된 yolov5 모델 이름. None이면 MODEL_CONFIG['person_detector']
+        device (str): 모델을 올릴 장치
+
+    Returns:
+        yolov5 AutoShape 모델 (eval 모드)
+    """
+    name = name or MODEL_CONFIG['person_detector']
+    if MODELS.get(name, {}).get('format') != 'yolov5':
+        raise ValueError(f"yolov5 모델이 아닙니다: {name}")
+    path = resolve(name)
+    repo = MODEL_CONFIG['yolov5_repo']
+    hub = MODEL_CONFIG['yolov5_hub']
+    has_repo = os.path.isfile(os.path.join(repo, 'hubconf.py'))
+    if not has_repo and not hub:
+        raise FileNotFoundError(
+            f"yolov5 저장소를 찾을 수 없습니다: {repo}\n"
+            "ultralytics/yolov5를 clone한 폴더를 MOZI_YOLOV5_REPO로 지정해 주세요. (README.md 참고)"
+        )
+
+    import torch
+    with _posix_checkpoint_paths():
+        if has_repo:
+            model = torch.hub.load(repo, 'custom', path=path, source='local', device=device, _verbose=False)
+        else:
+            print(f"yolov5 저장소가 없어 torch.hub({hub})로 불러옵니다: {repo}")
+            try:
+                model = torch.hub.load(
+                    hub, 'custom', path=path, device=device, trust_repo=True, skip_validation=True, _verbose=False
+                )
+            except Exception as e:
+                raise FileNotFoundError(
+                    f"yolov5 저장소를 찾을 수 없고 torch.hub({hub})로도 불러오지 못했습니다: {e}\n"
+                    "ultralytics/yolov5를 clone한 폴더를 MOZI_YOLOV5_REPO로 지정해 주세요. (README.md 참고)"
+                ) from e
+    return model.eval()
+
+def face_landmarker_path():
+    """설정된 얼굴 landmarker 모델의 확인된 경로를 반환합니다."""
+    return resolve(MODEL_CONFIG['face_landmarker'])
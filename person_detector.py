@@ -0,0 +1,230 @@
+import os
+import sys
+import cv2
+import numpy as np
+from model_registry import MODEL_CONFIG, MODELS, MODEL_DIR, load_yolov5
+
+# YOLO 입력 크기와 후처리 기준값
+IMG_SIZE = 320
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.45
+
+class PersonDetector:
+    """
+    사람 검출기 공통 인터페이스
+    backend마다 detect()만 구현하면 person_in_frame에서 그대로 사용할 수 있음.
+    """
+    backend = None
+
+    def __init__(self, name=None, img_size=IMG_SIZE):
+        self.name = name or MODEL_CONFIG['person_detector']
+        self.img_size = img_size
+        # 등록된 yolov5 모델은 모두 0번 클래스가 person
+        self.person_class = MODELS[self.name].get('person_class', 0)
+
+    def detect(self, frames):
+        """
+        여러 BGR 프레임에서 사람 박스를 찾는 함수
+        Argv:
+            frames (list of np.ndarray): BGR frame 리스트
+
+        Returns:
+            List of np.ndarray: 프레임별 (N, 5) 배열. 각 행은 픽셀 좌표 x1, y1, x2, y2, conf
+        """
+        raise NotImplementedError
+
+class TorchPersonDetector(PersonDetector):
+    """torch.hub(로컬 yolov5 저장소)로 불러온 PyTorch 모델을 그대로 사용하는 backend"""
+    backend = 'torch'
+
+    def __init__(self, name=None, img_size=IMG_SIZE):
+        super().__init__(name, img_size)
+        self.model = load_yolov5(self.name)
+        self.model.conf = CONF_THRESHOLD
+        self.model.iou = IOU_THRESHOLD
+        self.model.classes = [self.person_class]
+
+    def detect(self, frames):
+        if not frames:
+            return []
+        # yolov5 모델은 numpy 입력을 RGB로 받음
+        results = self.model([frame[:, :, ::-1] for frame in frames], size=self.img_size)
+        return [boxes.cpu().numpy()[:, :5] for boxes in results.xyxy]
+
+def letterbox(frame, size):
+    """
+    비율을 유지한 채 size x size 정사각형으로 줄이고 남는 부분을 회색(114)으로 채우는 함수
+    Returns:
+        Tuple: (size x size BGR 이미지, 축소 비율, (왼쪽 여백, 위쪽 여백))
+    """
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    return canvas, scale, (pad_x, pad_y)
+
+def decode_predictions(pred, scale, pad, frame_shape, person_class=0):
+    """
+    yolov5 출력 한 장을 원본 프레임 좌표의 사람 박스로 바꾸는 함수 (ONNX 계열 backend 공통)
+    Argv:
+        pred (np.ndarray): (N, 5 + 클래스 수). 각 행은 letterbox 좌표 cx, cy, w, h, objectness, 클래스별 점수
+        scale, pad: letterbox가 반환한 축소 비율과 여백
+        frame_shape (tuple): 원본 프레임의 shape
+        person_class (int): person 클래스 번호
+
+    Returns:
+        np.ndarray: (N, 5) x1, y1, x2, y2, conf. NMS 적용
+    """
+    conf = pred[:, 4] * pred[:, 5 + person_class]
+    keep = conf > CONF_THRESHOLD
+    if not np.any(keep):
+        return np.zeros((0, 5), dtype=np.float32)
+    pred, conf = pred[keep], conf[keep]
+
+    # letterbox 좌표 -> 원본 프레임 좌표
+    cx = (pred[:, 0] - pad[0]) / scale
+    cy = (pred[:, 1] - pad[1]) / scale
+    w = pred[:, 2] / scale
+    h = pred[:, 3] / scale
+    x1 = np.clip(cx - w / 2, 0, frame_shape[1])
+    y1 = np.clip(cy - h / 2, 0, frame_shape[0])
+    x2 = np.clip(cx + w / 2, 0, frame_shape[1])
+    y2 = np.clip(cy + h / 2, 0, frame_shape[0])
+
+    rects = np.stack([x1, y1, x2 - x1, y2 - y1], axis=1)
+    indices = cv2.dnn.NMSBoxes(rects.tolist(), conf.tolist(), CONF_THRESHOLD, IOU_THRESHOLD)
+    indices = np.array(indices, dtype=np.intp).reshape(-1)
+    return np.stack([x1, y1, x2, y2, conf], axis=1)[indices].astype(np.float32)
+
+def onnx_path(name):
+    """yolov5 체크포인트 이름에 해당하는 ONNX 파일 경로. ex) yolov5n.pt -> yolov5n.onnx"""
+    return os.path.join(MODEL_DIR, os.path.splitext(name)[0] + '.onnx')
+
+def _import_onnxruntime():
+    """onnxruntime은 선택 패키지이므로 없으면 설치 방법을 알려주는 ImportError를 발생시킴"""
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError(
+            "onnxruntime backend에는 onnxruntime 패키지가 필요합니다: pip install -r requirements-onnx.txt\n"
+            "(onnxruntime 없이 같은 ONNX 모델을 쓰려면 MOZI_DETECTOR_BACKEND=opencv)"
+        ) from e
+    return onnxruntime
+
+def _require_onnx(name):
+    path = onnx_path(name)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(
+            f"ONNX 모델이 없습니다: {path}\n"
+            f"먼저 'python person_detector.py export {name}'로 변환해 주세요."
+        )
+    return path
+
+class OnnxPersonDetector(PersonDetector):
+    """로컬에서 변환한 ONNX 모델을 onnxruntime(CPU)으로 실행하는 backend"""
+    backend = 'onnxruntime'
+
+    def __init__(self, name=None, img_size=IMG_SIZE):
+        super().__init__(name, img_size)
+        ort = _import_onnxruntime()
+        self.session = ort.InferenceSession(_require_onnx(self.name), providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def detect(self, frames):
+        if not frames:
+            return []
+        letterboxed = [letterbox(frame, self.img_size) for frame in frames]
+        # BGR -> RGB, HWC -> NCHW, 0~1 정규화
+        blob = np.stack([image for image, _, _ in letterboxed])[..., ::-1].transpose(0, 3, 1, 2)
+        blob = np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+        preds = self.session.run(None, {self.input_name: blob})[0]
+        return [
+            decode_predictions(pred, scale, pad, frame.shape, self.person_class)
+            for pred, frame, (_, scale, pad) in zip(preds, frames, letterboxed)
+        ]
+
+class OpenCVPersonDetector(PersonDetector):
+    """같은 ONNX 모델을 OpenCV DNN으로 실행하는 backend (onnxruntime 설치가 필요 없음)"""
+    backend = 'opencv'
+
+    def __init__(self, name=None, img_size=IMG_SIZE):
+        super().__init__(name, img_size)
+        self.net = cv2.dnn.readNetFromONNX(_require_onnx(self.name))
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def detect(self, frames):
+        results = []
+        # OpenCV DNN은 가변 batch 입력을 잘 지원하지 않으므로 프레임마다 실행
+        for frame in frames:
+            image, scale, pad = letterbox(frame, self.img_size)
+            blob = cv2.dnn.blobFromImage(image, 1 / 255.0, swapRB=True)
+            self.net.setInput(blob)
+            pred = self.net.forward()[0]
+            results.append(decode_predictions(pred, scale, pad, frame.shape, self.person_class))
+        return results
+
+BACKENDS = {
+    TorchPersonDetector.backend: TorchPersonDetector,
+    OnnxPersonDetector.backend: OnnxPersonDetector,
+    OpenCVPersonDetector.backend: OpenCVPersonDetector,
+}
+
+def create_detector(backend=None, name=None, img_size=IMG_SIZE, fallback=True):
+    """
+    설정된 backend로 사람 검출기를 만드는 함수
+    Argv:
+        backend (str): 'torch', 'onnxruntime', 'opencv'. None이면 MODEL_CONFIG['detector_backend']
+        name (str): MODELS에 등록된 yolov5 모델 이름. None이면 MODEL_CONFIG['person_detector']
+        img_size (int): YOLO 입력 크기
+        fallback (bool): torch backend를 만들 수 없을 때 ONNX 모델이 있으면 opencv backend를 대신 사용할지 여부
+    """
+    backend = backend or MODEL_CONFIG['detector_backend']
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 backend입니다: {backend} (지원: {', '.join(BACKENDS)})")
+    try:
+        return BACKENDS[backend](name, img_size)
+    except (ImportError, FileNotFoundError) as e:
+        # torch나 yolov5 저장소가 없어도 미리 변환해 둔 ONNX 모델이 있으면 OpenCV DNN으로 실행
+        fallback_name = name or MODEL_CONFIG['person_detector']
+        if not fallback or backend != TorchPersonDetector.backend or not os.path.isfile(onnx_path(fallback_name)):
+            raise
+        print(f"{backend} backend를 사용할 수 없어 opencv backend로 실행합니다: {e}")
+        return OpenCVPersonDetector(name, img_size)
+
+def export_onnx(name=None, img_size=IMG_SIZE):
+    """
+    등록된 yolov5 체크포인트를 ONNX로 변환해 모델 폴더에 저장하는 함수 (설치 시 한 번만)
+    입력은 (B, 3, img_size, img_size) RGB 0~1, 출력은 (B, N, 5 + 클래스 수)
+    Returns:
+        Str: 저장한 ONNX 파일 경로
+    """
+    try:
+        import torch
+    except ImportError as e:
+        raise ImportError("ONNX 변환에는 torch와 yolov5 저장소가 필요합니다. (README.md의 설치 및 실행 참고)") from e
+    name = name or MODEL_CONFIG['person_detector']
+    # AutoShape -> DetectMultiBackend -> DetectionModel
+    model = load_yolov5(name).model.model.float().eval()
+    for module in model.modules():
+        # Detect 레이어가 후처리용 중간 출력 없이 예측 텐서만 반환하도록 설정
+        if hasattr(module, 'export'):
+            module.export = True
+    path = onnx_path(name)
+    dummy = torch.zeros(1, 3, img_size, img_size)
+    torch.onnx.export(
+        model, dummy, path, opset_version=12,
+        input_names=['images'], output_names=['output'], do_constant_folding=True,
+        # onnxruntime에서는 여러 플레이어의 프레임을 한 번에 넣을 수 있도록 batch 크기는 가변
+        dynamic_axes={'images': {0: 'batch'}, 'output': {0: 'batch'}},
+    )
+    return path
+
+if __name__ == '__main__':
+    # 사용법: python person_detector.py export [모델 이름]
+    if len(sys.argv) >= 2 and sys.argv[1] == 'export':
+        print(export_onnx(sys.argv[2] if len(sys.argv) >= 3 else None))
+    else:
+        print("usage: python person_detector.py export [yolov5n.pt|best.pt|last.pt]")
@@ -1,42 +1,117 @@
 import cv2
-from ultralytics import YOLO
-import torch
 import numpy as np
-from matplotlib import pyplot as plt
+from person_detector import create_detector
 
-model = YOLO("yolov5nu.pt")
+# 사람 검출기는 처음 사용할 때 로드함. 미리 로드하려면 warmup() 호출
+# 사용할 모델과 backend는 model_registry.MODEL_CONFIG의 'person_detector', 'detector_backend'로 정함
+detector = None
+# 검출기를 만들지 못했을 때의 오류. 프레임마다 모델 로드(torch.hub 등)를 다시 시도하지 않도록 보관
+detector_error = None
 
-def person_in_frame(frame):
-    # model을 통해 객체 인식
-    results = model(frame, imgsz=320) # 객체 여러 개 감지될 수 있음
+def get_detector():
+    """사람 검출기를 처음 호출될 때 한 번만 만들어 반환합니다. 만들지 못했으면 같은 오류를 다시 발생시킵니다."""
+    global detector, detector_error
+    if detector_error is not None:
+        raise detector_error
+    if detector is None:
+        try:
+            detector = create_detector()
+        except Exception as e:
+            detector_error = e
+            raise
+    return detector
 
-    # 감지된 결과를 하나씩 처리
-    x_shape = frame.shape[1]
-    y_shape = frame.shape[0]
-    
+def warmup(width=640, height=480, batch=1):
+    """
+    YOLO 모델을 미리 로드하고, 빈 프레임으로 한 번 실행해 두는 함수
+    Argv:
+        width, height (int): 실제로 넣을 프레임 크기
+        batch (int): 한 번에 넣을 프레임 수
+    """
+    dummy = np.zeros((height, width, 3), dtype=np.uint8)
+    persons_in_frames([dummy] * batch)
+
+# 잘라낼 때 사람 박스 바깥으로 더 포함할 여백 (픽셀)
+BOX_PADDING = 15
+
+def largest_person_box(boxes):
+    """
+    YOLO 결과에서 가장 큰 사람 박스를 찾는 함수
+    Argv:
+        boxes (np.ndarray): frame에서 찾은 사람 박스. (N, 5) 각 행은 픽셀 좌표 x1, y1, x2, y2, conf
+
+    Returns:
+        Tuple: (x1, y1, x2, y2) 정수 좌표. 사람이 없으면 None
+    """
     max_area = 0
     target_box = None
-    result = results[0]
-    boxes = result.boxes # 해당 필드에는 x1, y1, x2, y2, conf, cls
     
     for box in boxes:
-        x1, y1, x2, y2 = map(int, box.xyxy[0])
+        x1, y1, x2, y2 = map(int, box[:4])
         area = (x2-x1) * (y2-y1)
-        cls_id = int(box.cls[0])
-        class_name = model.names[cls_id]
 
-        if area > max_area and class_name == "person":
+        if area > max_area:
             max_area = area
             target_box = (x1, y1, x2, y2)
+    return target_box
 
-    if target_box is not None:
-        x1, y1, x2, y2 = target_box
-        x1 = max(0, x1 - 15)
-        y1 = max(0, y1 - 15)
-        x2 = min(x2 + 15, x_shape)
-        y2 = min(y2 + 15, y_shape)
-        result = frame[y1:y2, x1:x2, :]   # 인식한 객체 박스 크롭
-    else:
+def crop_box(frame, box):
+    """
+    박스에 여백을 더해 프레임을 잘라내는 함수
+    Argv:
+        frame (np.ndarray): BGR frame
+        box (tuple): (x1, y1, x2, y2) 픽셀 좌표. None이면 None 반환
+
+    Returns:
+        np.ndarray: 잘라낸 이미지. 박스가 프레임 밖이면 None
+    """
+    if box is None:
         return None
+    x_shape = frame.shape[1]
+    y_shape = frame.shape[0]
+    x1, y1, x2, y2 = map(int, box)
+    x1 = max(0, x1 - BOX_PADDING)
+    y1 = max(0, y1 - BOX_PADDING)
+    x2 = min(x2 + BOX_PADDING, x_shape)
+    y2 = min(y2 + BOX_PADDING, y_shape)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return frame[y1:y2, x1:x2, :]   # 인식한 객체 박스 크롭
+
+def crop_person(frame, boxes):
+    """
+    YOLO 결과에서 가장 큰 사람 박스를 찾아 프레임을 잘라내는 함수
+    Argv:
+        frame (np.ndarray): YOLO에 넣은 BGR frame
+        boxes (np.ndarray): frame에서 찾은 사람 박스. (N, 5) 각 행은 픽셀 좌표 x1, y1, x2, y2, conf
+
+    Returns:
+        np.ndarray: 사람 영역을 잘라낸 이미지. 사람이 없으면 None
+    """
+    return crop_box(frame, largest_person_box(boxes))
+
+def person_boxes_in_frames(frames):
+    """
+    여러 프레임에서 가장 큰 사람 박스를 한 번의 batch 추론으로 찾는 함수
+    Returns:
+        List: 프레임별 (x1, y1, x2, y2). 사람이 없는 프레임은 None
+    """
+    if not frames:
+        return []
+    results = get_detector().detect(list(frames))
+    return [largest_person_box(boxes) for boxes in results]
+
+def person_in_frame(frame):
+    # model을 통해 객체 인식
+    return persons_in_frames([frame])[0]
+
+def persons_in_frames(frames):
+    """
+    여러 프레임(플레이어별 웹캠)을 한 번의 batch 추론으로 처리하는 함수
+    Argv:
+        frames (list of np.ndarray): BGR frame 리스트
 
-    return result
\ No newline at end of file
+    Returns:
+        List: 프레임별로 잘라낸 사람 이미지 리스트. 사람이 없는 프레임은 None
+    """
+    return [crop_box(frame, box) for frame, box in zip(frames, person_boxes_in_frames(frames))]
@@ -0,0 +1,99 @@
+import numpy as np
+from person_in_frame import person_boxes_in_frames, crop_box
+
+# 몇 번 잘라낼 때마다 YOLO로 사람 박스를 새로 찾을지
+REDETECT_INTERVAL = 10
+# 새로 찾은 박스와 예측한 박스를 섞는 비율 (1이면 새 박스만 사용, 0이면 예측만 사용)
+SMOOTHING = 0.6
+
+class PersonTracker:
+    """
+    플레이어(카메라) 한 명의 사람 박스를 프레임 사이에서 재사용하는 추적기
+    플레이어는 프레임 사이에 거의 움직이지 않으므로 YOLO는 REDETECT_INTERVAL번에 한 번,
+    또는 landmarker가 얼굴을 놓쳤을 때만 다시 실행하고,
+    그 사이에는 마지막 박스를 등속 운동으로 예측해 프레임을 잘라냄.
+    """
+    def __init__(self, redetect_interval=REDETECT_INTERVAL, smoothing=SMOOTHING):
+        self.redetect_interval = redetect_interval
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        # 현재 프레임의 (x1, y1, x2, y2) float 배열
+        self.box = None
+        # 프레임마다 박스가 움직이는 양
+        self.velocity = np.zeros(4)
+        # 마지막으로 YOLO를 실행한 뒤 처리한 프레임 수
+        self.age = 0
+        self.lost = False
+        # YOLO 실행 횟수 (벤치마크/디버깅용)
+        self.detections = 0
+
+    def needs_detection(self):
+        return self.box is None or self.lost or self.age >= self.redetect_interval
+
+    def update(self, box):
+        """
+        현재 프레임에서 YOLO로 새로 찾은 박스를 반영하는 함수
+        Argv:
+            box (tuple): person_boxes_in_frames가 찾은 (x1, y1, x2, y2). 사람이 없으면 None
+        """
+        self.detections += 1
+        self.lost = False
+        if box is None:
+            self.box = None
+            self.velocity[:] = 0
+        else:
+            measured = np.asarray(box, dtype=np.float64)
+            if self.box is None:
+                self.box = measured
+                self.velocity[:] = 0
+            else:
+                # 등속 운동으로 예측한 박스와 새 박스의 차이만큼 위치와 속도를 보정
+                predicted = self.box + self.velocity
+                residual = measured - predicted
+                self.box = predicted + self.smoothing * residual
+                self.velocity = self.velocity + self.smoothing * residual / max(self.age, 1)
+        self.age = 0
+
+    def step(self, detected):
+        """
+        현재 프레임에서 사용할 박스를 반환하는 함수
+        Argv:
+            detected (bool): 이번 프레임에서 update()를 호출했는지 여부. 아니면 등속 운동으로 예측
+        Returns:
+            Tuple: (x1, y1, x2, y2). 박스가 없으면 None
+        """
+        self.age += 1
+        if self.box is None:
+            return None
+        if not detected:
+            self.box = self.box + self.velocity
+        return tuple(self.box)
+
+    def mark_lost(self):
+        """잘라낸 영역에서 얼굴을 못 찾았을 때 호출. 다음에는 YOLO를 다시 실행함"""
+        self.lost = True
+
+def crop_with_trackers(frames, trackers):
+    """
+    추적기로 프레임들을 잘라내는 함수. YOLO가 필요한 추적기의 프레임만 한 번의 batch로 검출
+    Argv:
+        frames (list of np.ndarray): BGR frame 리스트
+        trackers (list of PersonTracker): frame별 추적기
+
+    Returns:
+        Tuple: (잘라낸 이미지 리스트, frame별 이번에 YOLO를 실행했는지 여부 리스트)
+               사람이 없는 frame은 None
+    """
+    detect = [i for i, tracker in enumerate(trackers) if tracker.needs_detection()]
+    if detect:
+        boxes = person_boxes_in_frames([frames[i] for i in detect])
+        for i, box in zip(detect, boxes):
+            trackers[i].update(box)
+    detected = [i in detect for i in range(len(frames))]
+    crops = [
+        crop_box(frame, tracker.step(was_detected))
+        for frame, tracker, was_detected in zip(frames, trackers, detected)
+    ]
+    return crops, detected
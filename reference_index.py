@@ -0,0 +1,158 @@
+import numpy as np
+from model_registry import MODEL_CONFIG
+
+# 라벨별 점수를 구하는 방식
+# 'max': 가장 비슷한 참조 얼굴의 유사도
+# 'topk': 가장 비슷한 참조 얼굴 top_k개의 평균 유사도 (참조 얼굴이 적으면 있는 만큼)
+REDUCTIONS = ('max', 'topk')
+# 참조 얼굴이 이 수 이상이면 순위 검색에 KD-tree를 사용 (scipy가 없으면 행렬 곱 사용)
+TREE_MIN_ROWS = 5000
+# KD-tree에서 한 번에 가져올 최근접 참조 얼굴 수
+TREE_NEIGHBORS = 256
+
+class ReferenceIndex:
+    """
+    라벨(이모지)마다 여러 장의 참조 얼굴을 두고, 한 번의 벡터 연산으로 라벨별 유사도를 구하는 인덱스
+    참조 벡터는 라벨 순서로 정렬해 두고, 라벨별 행 번호를 (라벨 수, 최대 참조 수) 표로 만들어 둠.
+    프레임 벡터와의 코사인 유사도는 행렬 곱 한 번으로 구한 뒤, 표로 모아 라벨별 max/top-k 평균을 계산함.
+    따라서 참조 얼굴이 늘어나도 Python 반복문은 늘어나지 않음.
+    """
+    def __init__(self, vectors, labels, reduction=None, top_k=None):
+        """
+        Argv:
+            vectors (np.ndarray): (N, D) 참조 특징값 (정규화 전)
+            labels (np.ndarray): (N,) 참조 얼굴별 이모지 라벨
+            reduction (str): 'max' 또는 'topk'. None이면 MODEL_CONFIG['reference_reduction']
+            top_k (int): 'topk'에서 평균낼 참조 얼굴 수. None이면 MODEL_CONFIG['reference_top_k']
+        """
+        self.reduction = reduction or MODEL_CONFIG['reference_reduction']
+        if self.reduction not in REDUCTIONS:
+            raise ValueError(f"지원하지 않는 reduction입니다: {self.reduction} (지원: {', '.join(REDUCTIONS)})")
+        self.top_k = top_k or MODEL_CONFIG['reference_top_k']
+
+        labels = np.asarray(labels, dtype=np.int64)
+        order = np.argsort(labels, kind='stable')
+        matrix = np.asarray(vectors, dtype=np.float32)[order]
+        # 각 행을 단위 벡터로 만들어 두면 코사인 유사도가 내적 한 번으로 끝남
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+        self.row_labels = labels[order]
+
+        # 라벨별 행 번호 표. 참조 얼굴 수가 다른 라벨은 -1로 채움
+        self.labels, starts, counts = np.unique(self.row_labels, return_index=True, return_counts=True)
+        self.label_to_index = {int(label): i for i, label in enumerate(self.labels)}
+        self.counts = counts
+        width = int(counts.max()) if len(counts) else 0
+        offsets = np.arange(width)
+        self.grid = np.where(offsets < counts[:, None], starts[:, None] + offsets, -1)
+        self.tree = None
+        if len(self.matrix) >= TREE_MIN_ROWS:
+            self.tree = self._build_tree()
+
+    def _build_tree(self):
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            return None
+        # 단위 벡터 사이의 유클리드 거리 순서는 코사인 유사도 순서와 같음
+        return cKDTree(self.matrix)
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def _reduce(self, sims, label_indices):
+        """
+        참조 얼굴별 유사도를 라벨별 점수로 모으는 함수
+        Argv:
+            sims (np.ndarray): (N,) 참조 얼굴별 코사인 유사도
+            label_indices (np.ndarray): 점수를 구할 라벨의 self.labels 내 위치
+        """
+        grid = self.grid[label_indices]
+        valid = grid >= 0
+        table = np.where(valid, sims[np.maximum(grid, 0)], -np.inf)
+        if self.reduction == 'max' or table.shape[1] == 1:
+            return table.max(axis=1)
+        k = min(self.top_k, table.shape[1])
+        # 라벨마다 큰 값 k개를 골라 평균 (참조 얼굴이 k개보다 적으면 있는 만큼만)
+        top = -np.partition(-table, k - 1, axis=1)[:, :k]
+        used = np.minimum(self.counts[label_indices], k)
+        return np.where(np.isfinite(top), top, 0).sum(axis=1) / used
+
+    def score_labels(self, vector, labels):
+        """
+        Argv:
+            vector (np.ndarray): (D,) 단위 벡터
+            labels (iterable of int): 점수를 구할 이모지 라벨들
+
+        Returns:
+            np.ndarray: 라벨별 유사도 (%). 참조 얼굴이 없는 라벨은 0
+        """
+        return self.score_rows(vector, [self.label_to_index.get(int(label)) for label in labels])
+
+    def score_rows(self, vector, rows):
+        """
+        score_labels와 같지만 라벨 대신 라벨의 self.labels 내 위치(row)로 점수를 구하는 함수
+        라벨 -> 위치 변환을 미리 해 둔 쪽(EmojiRegistry)이 매 프레임 호출함.
+        Argv:
+            vector (np.ndarray): (D,) 단위 벡터
+            rows (list of int): label_to_index의 값. None이면 참조 얼굴이 없는 라벨
+
+        Returns:
+            np.ndarray: row별 유사도 (%). None인 row는 0
+        """
+        scores = np.zeros(len(rows), dtype=np.float32)
+        present = [i for i, index in enumerate(rows) if index is not None]
+        if vector is None or not present:
+            return scores
+        label_indices = np.array([rows[i] for i in present], dtype=np.intp)
+        # 필요한 라벨의 참조 얼굴만 행렬 곱
+        if len(label_indices) < len(self.labels):
+            grid = self.grid[label_indices]
+            rows = grid[grid >= 0]
+            sims = np.zeros(len(self.matrix), dtype=np.float32)
+            sims[rows] = self.matrix[rows] @ vector
+        else:
+            sims = self.matrix @ vector
+        scores[present] = np.clip(self._reduce(sims, label_indices), 0, 1) * 100.0
+        return scores
+
+    def score_label(self, vector, label):
+        """vector와 label 이모지의 유사도 (%). 벡터가 None이거나 참조 얼굴이 없으면 0"""
+        return float(self.score_labels(vector, [label])[0])
+
+    def rank(self, vector, labels, k=3):
+        """
+        후보 라벨 중 vector와 가장 비슷한 라벨 k개를 찾는 함수
+        참조 얼굴이 많고 scipy가 있으면 KD-tree로 가까운 참조 얼굴만 모아 계산함.
+        Returns:
+            List of tuple: 유사도 내림차순 (label, 유사도 %) 리스트
+        """
+        labels = [label for label in dict.fromkeys(int(label) for label in labels) if label in self.label_to_index]
+        if vector is None or not labels:
+            return []
+        if self.tree is not None and self.reduction == 'max':
+            ranked = self._rank_with_tree(vector, labels, k)
+            if ranked is not None:
+                return ranked
+        scores = self.score_labels(vector, labels)
+        order = np.argsort(scores)[::-1][:k]
+        return [(labels[i], float(scores[i])) for i in order]
+
+    def _rank_with_tree(self, vector, labels, k):
+        """
+        KD-tree로 가까운 참조 얼굴들만 가져와 라벨별 최대 유사도로 순위를 매기는 함수
+        가져온 참조 얼굴에 후보 라벨이 k개 미만이면 None (행렬 곱으로 다시 계산)
+        """
+        distances, rows = self.tree.query(vector, k=min(TREE_NEIGHBORS, len(self.matrix)))
+        candidates = set(labels)
+        best = {}
+        for distance, row in zip(np.atleast_1d(distances), np.atleast_1d(rows)):
+            label = int(self.row_labels[row])
+            if label in candidates and label not in best:
+                # 단위 벡터 사이: cos = 1 - d^2 / 2
+                best[label] = float(np.clip(1 - distance ** 2 / 2, 0, 1)) * 100.0
+                if len(best) == k:
+                    break
+        if len(best) < min(k, len(labels)):
+            return None
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)
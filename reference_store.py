@@ -0,0 +1,260 @@
+import os
+import re
+import sys
+import argparse
+import tempfile
+import numpy as np
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from model_registry import MODEL_CONFIG, MODELS, MODEL_DIR, sha256sum
+
+# 이모지별 참조 표정 특징값을 저장하는 바이너리 파일 (faces.csv 대체)
+# npz 안의 배열
+#   version      : 파일 형식 버전
+#   model_sha256 : 특징값을 추출한 face landmarker 모델의 sha256
+#   categories   : (D,) blendshape 특징 이름 (열 순서)
+#   vectors      : (N, D) float32 특징값
+#   labels       : (N,) int64 이모지 라벨
+#   names        : (N,) 특징값을 추출한 사람 이미지 파일 이름
+#   sources      : (N,) 사람 이미지 파일의 sha256 (바뀌지 않은 이미지는 다시 추출하지 않음)
+FORMAT_VERSION = 2
+DEFAULT_PATH = os.path.join(MODEL_DIR, 'faces.npz')
+EMOJI_DIR = 'img/emoji'
+HUMAN_DIR = 'img/human'
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+class StaleReferenceError(ValueError):
+    """저장된 참조값의 형식 버전이나 landmarker 모델이 현재와 달라 다시 만들어야 할 때 발생"""
+
+class ReferenceSet:
+    """참조 특징값 묶음. 행 순서는 vectors, labels, names가 모두 같음"""
+    def __init__(self, categories, vectors, labels, names, sources, model_sha256):
+        self.categories = [str(c) for c in categories]
+        self.vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, len(self.categories))
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.names = [str(n) for n in names]
+        self.sources = [str(h) for h in sources]
+        self.model_sha256 = str(model_sha256)
+
+    def __len__(self):
+        return len(self.labels)
+
+def current_model_sha256():
+    """현재 설정된 face landmarker 모델의 sha256을 반환합니다."""
+    return MODELS[MODEL_CONFIG['face_landmarker']]['sha256']
+
+def image_label(file_name):
+    """'15_sullen.jpg' 형태의 파일 이름에서 라벨 번호를 꺼냅니다. 라벨이 없으면 None"""
+    match = re.match(r'(\d+)_', file_name)
+    return int(match.group(1)) if match else None
+
+def list_images(directory):
+    return sorted(
+        f for f in os.listdir(directory)
+        if f.lower().endswith(IMAGE_EXTENSIONS) and not f.startswith('.')
+    )
+
+def save(refs, path=DEFAULT_PATH):
+    """
+    참조값을 임시 파일에 쓴 뒤 교체해, 쓰는 도중에 읽는 쪽이 깨진 파일을 보지 않도록 저장합니다.
+    worker 프로세스와 EmojiWatcher가 동시에 저장할 수 있으므로 임시 파일은 저장할 때마다 다른 이름으로 만듦.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.npz.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            np.savez(
+                file,
+                version=np.int64(FORMAT_VERSION),
+                model_sha256=np.str_(refs.model_sha256),
+                categories=np.array(refs.categories, dtype=np.str_),
+                vectors=refs.vectors,
+                labels=refs.labels,
+                names=np.array(refs.names, dtype=np.str_),
+                sources=np.array(refs.sources, dtype=np.str_),
+            )
+        # mkstemp는 소유자만 읽을 수 있는 파일을 만들므로 기존처럼 다른 사용자도 읽을 수 있게 함
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def load(path=DEFAULT_PATH, model_sha256=None):
+    """
+    저장된 참조값을 불러오는 함수
+    Argv:
+        path (str): npz 파일 경로
+        model_sha256 (str): 현재 landmarker 모델의 sha256. None이면 current_model_sha256()
+
+    Returns:
+        ReferenceSet: 불러온 참조값
+                      파일이 없으면 FileNotFoundError,
+                      형식 버전이나 모델이 다르면 StaleReferenceError 발생
+    """
+    model_sha256 = model_sha256 or current_model_sha256()
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['version']) != FORMAT_VERSION:
+            raise StaleReferenceError(f"참조값 형식 버전이 다릅니다: {int(data['version'])} (현재 {FORMAT_VERSION})")
+        if str(data['model_sha256']) != model_sha256:
+            raise StaleReferenceError("참조값을 만든 landmarker 모델이 현재 모델과 다릅니다.")
+        return ReferenceSet(
+            data['categories'], data['vectors'], data['labels'], data['names'], data['sources'],
+            str(data['model_sha256']),
+        )
+
+def _extract_file(path):
+    """
+    이미지 파일 한 장에서 blendshape 특징값을 추출하는 함수 (process pool에서 실행)
+    Returns:
+        Tuple: (특징 이름 리스트, 특징값 리스트). 실패하면 (None, 실패 이유)
+    """
+    import cv2
+    from compare import extract_blendshape_scores
+    img = cv2.imread(path)
+    if img is None:
+        return None, "이미지를 읽을 수 없음"
+    blendshape = extract_blendshape_scores(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    if blendshape is None:
+        return None, "얼굴을 찾지 못함"
+    return [bs.category_name for bs in blendshape], [bs.score for bs in blendshape]
+
+class BuildReport:
+    """build() 결과 요약"""
+    def __init__(self):
+        self.added = []
+        self.reused = []
+        self.removed = []
+        # (파일 이름, 실패 이유)
+        self.failed = []
+
+    def __str__(self):
+        lines = [
+            f"added {len(self.added)}, reused {len(self.reused)}, "
+            f"removed {len(self.removed)}, failed {len(self.failed)}"
+        ]
+        lines += [f"  실패: {name} ({reason})" for name, reason in self.failed]
+        return "\n".join(lines)
+
+def build(emoji_dir=EMOJI_DIR, human_dir=HUMAN_DIR, path=DEFAULT_PATH, workers=None, incremental=True):
+    """
+    사람 이미지에서 표정 특징값을 추출해 참조값 파일을 만드는 함수
+    human_dir의 이미지 중 emoji_dir에 같은 라벨의 이모지가 있는 이미지만 사용함.
+    ex) img/human/15_sullen.jpg, img/human/15_sullen_2.jpg -> img/emoji/15_sullen.png의 참조값
+    기존 파일에 같은 내용(sha256)의 이미지가 이미 있으면 다시 추출하지 않고,
+    새 이미지만 process pool에서 동시에 추출함. 결과 파일은 다 만든 뒤 한 번에 교체됨.
+    Argv:
+        workers (int): 추출에 쓸 프로세스 수. None이면 CPU 수
+        incremental (bool): False면 기존 파일을 무시하고 모든 이미지를 다시 추출
+
+    Returns:
+        Tuple: (저장한 ReferenceSet, BuildReport)
+    """
+    report = BuildReport()
+    model_sha256 = current_model_sha256()
+    emoji_labels = {image_label(f) for f in list_images(emoji_dir)}
+    files = [
+        f for f in list_images(human_dir)
+        if image_label(f) is not None and image_label(f) in emoji_labels
+    ]
+    hashes = {f: sha256sum(os.path.join(human_dir, f)) for f in files}
+
+    # 이미 추출해 둔 이미지는 {sha256: 특징 딕셔너리}로 재사용
+    cached = {}
+    old = None
+    if incremental:
+        try:
+            old = load(path, model_sha256)
+        except (FileNotFoundError, StaleReferenceError):
+            old = None
+    if old is not None:
+        for name, source, vector in zip(old.names, old.sources, old.vectors):
+            cached[source] = dict(zip(old.categories, vector.tolist()))
+        report.removed = [name for name, source in zip(old.names, old.sources) if source not in hashes.values()]
+
+    extracted = {}
+    new_files = [f for f in files if hashes[f] not in cached]
+    if new_files:
+        workers = workers or os.cpu_count() or 1
+        # daemon 프로세스(inference worker)는 자식 프로세스를 만들 수 없으므로 그 안에서는 순서대로 추출
+        if multiprocessing.current_process().daemon:
+            workers = 1
+        paths = [os.path.join(human_dir, f) for f in new_files]
+        if workers > 1 and len(new_files) > 1:
+            # mediapipe가 이미 로드된 프로세스를 fork하지 않도록 spawn 사용
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(workers, len(new_files)), mp_context=context) as pool:
+                results = list(pool.map(_extract_file, paths))
+        else:
+            results = [_extract_file(p) for p in paths]
+        for file_name, (categories, values) in zip(new_files, results):
+            if categories is None:
+                report.failed.append((file_name, values))
+            else:
+                extracted[hashes[file_name]] = dict(zip(categories, values))
+
+    categories = old.categories if old is not None else None
+    if categories is None and extracted:
+        categories = list(next(iter(extracted.values())).keys())
+    if categories is None:
+        raise ValueError(f"참조값을 만들 수 있는 사람 이미지가 없습니다: {human_dir}")
+
+    vectors, labels, names, sources = [], [], [], []
+    for file_name in files:
+        source = hashes[file_name]
+        scores = cached.get(source) or extracted.get(source)
+        if scores is None:
+            continue
+        (report.reused if source in cached else report.added).append(file_name)
+        vectors.append([scores.get(name, 0.0) for name in categories])
+        labels.append(image_label(file_name))
+        names.append(file_name)
+        sources.append(source)
+
+    refs = ReferenceSet(categories, vectors, labels, names, sources, model_sha256)
+    save(refs, path)
+    return refs, report
+
+def import_csv(csv_path, path=DEFAULT_PATH):
+    """
+    예전 faces.csv(특징 이름 열 + labels 열)를 참조값 파일로 변환하는 함수
+    csv를 만든 모델은 현재 설정된 landmarker 모델로 간주함.
+    """
+    import csv
+    with open(csv_path, encoding='UTF-8', newline='') as file:
+        rows = list(csv.reader(file))
+    header, rows = rows[0], [row for row in rows[1:] if row]
+    label_column = header.index('labels')
+    categories = [name for i, name in enumerate(header) if i != label_column]
+    vectors = [[float(v) for i, v in enumerate(row) if i != label_column] for row in rows]
+    labels = [int(row[label_column]) for row in rows]
+    names = [f"{os.path.basename(csv_path)}:{row_index + 2}" for row_index in range(len(rows))]
+    # 원본 이미지가 없으므로 다음 build에서는 모두 새로 추출됨
+    sources = [""] * len(rows)
+    refs = ReferenceSet(categories, vectors, labels, names, sources, current_model_sha256())
+    save(refs, path)
+    return refs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="이모지 참조 표정 특징값(faces.npz) 관리")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build_parser = sub.add_parser('build', help="사람 이미지에서 참조값을 다시 만듦")
+    build_parser.add_argument('--emoji-dir', default=EMOJI_DIR)
+    build_parser.add_argument('--human-dir', default=HUMAN_DIR)
+    build_parser.add_argument('--out', default=DEFAULT_PATH)
+    build_parser.add_argument('--workers', type=int, default=None, help="추출에 쓸 프로세스 수 (기본: CPU 수)")
+    build_parser.add_argument('--full', action='store_true', help="기존 참조값을 무시하고 모두 다시 추출")
+    import_parser = sub.add_parser('import-csv', help="예전 faces.csv를 변환")
+    import_parser.add_argument('csv_path')
+    import_parser.add_argument('--out', default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        refs, report = build(args.emoji_dir, args.human_dir, args.out, args.workers, not args.full)
+        print(report)
+    else:
+        refs = import_csv(args.csv_path, args.out)
+    print(f"{args.out}: {len(refs)} references, {len(refs.categories)} categories")
+    return refs
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,99 @@
+import numpy as np
+from multiprocessing import shared_memory
+from frame_buffer import _attach_shared_memory
+
+# mediapipe FaceLandmarker가 출력하는 blendshape 특징 수
+VECTOR_SIZE = 52
+
+class VectorBlock:
+    """
+    inference worker가 추출한 표정 특징 벡터를 GUI에 전달하는 shared memory 블록
+    worker는 이모지와의 비교 없이 프레임별 정규화된 blendshape 벡터와 그 프레임의 시퀀스 번호만 쓰고,
+    현재 목표 이모지와의 비교는 읽는 쪽(GUI)에서 함.
+    따라서 목표 이모지가 바뀌어도 이미 추출 중인 프레임이 버려지지 않고,
+    벡터 하나로 여러 이모지와의 유사도나 순위를 구할 수 있음.
+
+    플레이어별 한 행을 seqlock 방식으로 관리함.
+    - 값은 worker만 쓰고, 쓰는 동안 version을 홀수로 둠.
+      읽는 쪽은 version이 짝수이고 읽기 전후로 같을 때만 값을 사용함.
+    따라서 쓰는 쪽은 항상 하나이고, lock 없이 동작함.
+    결과에는 프레임을 보낼 때의 목표 epoch 번호가 함께 저장되어, 읽는 쪽이 이전 목표의 결과를 걸러낼 수 있음.
+    """
+    # 정수 필드: (version, 벡터를 추출한 프레임의 시퀀스 번호, 얼굴을 찾았는지 여부, 프레임의 epoch 번호)
+    INT_FIELDS = 4
+    # 값을 읽는 중 덮어써졌을 때 다시 시도하는 횟수
+    READ_RETRIES = 100
+
+    def __init__(self, num_players, vector_size=VECTOR_SIZE):
+        self.num_players = num_players
+        self.vector_size = vector_size
+        self.shm = shared_memory.SharedMemory(create=True, size=self._size())
+        self.owner = True
+        self._map_arrays()
+        self.ints[:] = 0
+        # 아직 결과가 없는 플레이어는 seq = -1, epoch = -1
+        self.ints[:, 1] = -1
+        self.ints[:, 3] = -1
+        self.vectors[:] = 0
+
+    def _size(self):
+        p, d = self.num_players, self.vector_size
+        return 8 * p * self.INT_FIELDS + 4 * p * d
+
+    def _map_arrays(self):
+        p, d = self.num_players, self.vector_size
+        self.ints = np.ndarray((p, self.INT_FIELDS), dtype=np.int64, buffer=self.shm.buf)
+        self.vectors = np.ndarray((p, d), dtype=np.float32, buffer=self.shm.buf, offset=self.ints.nbytes)
+
+    # spawn 방식의 Process 인자로 넘길 때는 이름만 전달하고 받는 쪽에서 다시 연결
+    def __getstate__(self):
+        return {'name': self.shm.name, 'num_players': self.num_players, 'vector_size': self.vector_size}
+
+    def __setstate__(self, state):
+        self.num_players = state['num_players']
+        self.vector_size = state['vector_size']
+        self.shm = _attach_shared_memory(state['name'])
+        self.owner = False
+        self._map_arrays()
+
+    # ---- GUI 쪽 ----
+    def latest(self, player_index):
+        """
+        플레이어의 가장 최근 결과를 일관된 상태로 복사해 오는 함수
+        Returns:
+            Tuple: (시퀀스 번호, epoch 번호, 단위 벡터 복사본). 얼굴을 못 찾은 프레임이면 벡터는 None
+                   아직 결과가 없거나 worker가 계속 쓰고 있어 읽지 못하면 (-1, -1, None)
+        """
+        for _ in range(self.READ_RETRIES):
+            version = self.ints[player_index, 0]
+            if version % 2:
+                continue
+            _, seq, found, epoch = (int(v) for v in self.ints[player_index])
+            vector = self.vectors[player_index].copy() if found else None
+            if self.ints[player_index, 0] == version:
+                return seq, epoch, vector
+        return -1, -1, None
+
+    # ---- worker 쪽 ----
+    def write_vector(self, player_index, seq, epoch, vector):
+        """
+        프레임 한 장의 추출 결과를 쓰는 함수 (worker 전용)
+        Argv:
+            seq (int): 벡터를 추출한 프레임의 시퀀스 번호
+            epoch (int): 프레임을 보낼 때의 목표 epoch 번호
+            vector (np.ndarray): blendshape_to_vector의 단위 벡터. 얼굴이 없으면 None
+        """
+        self.ints[player_index, 0] += 1
+        if vector is not None:
+            self.vectors[player_index] = vector
+        self.ints[player_index, 2] = vector is not None
+        self.ints[player_index, 3] = epoch
+        self.ints[player_index, 1] = seq
+        self.ints[player_index, 0] += 1
+
+    def close(self):
+        """shared memory 연결을 닫고, 생성한 쪽이면 메모리도 해제합니다."""
+        self.ints = self.vectors = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,168 @@
+import time
+import threading
+import cv2
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter, QGuiApplication
+from PyQt5.QtWidgets import QLabel
+
+class FrameScaler:
+    """
+    capture 스레드에서 BGR 프레임을 화면 크기에 맞게 줄이는 변환기
+    cv2.resize로 화면 크기의 배열에 바로 줄이므로 색 변환(BGR -> RGB)이나 QImage.scaled 복사를 하지 않음.
+    줄인 배열은 프레임마다 새로 만들어 GUI 쪽(VideoWidget)에 소유권을 넘기므로,
+    GUI가 QImage로 감싸 그리는 동안 capture 스레드가 같은 메모리에 다음 프레임을 쓰지 않음.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def scale(self, frame):
+        """
+        Argv:
+            frame (np.ndarray): 웹캠의 BGR frame. (H, W, 3)
+                                cap.read()/retrieve()가 프레임마다 새로 만든 배열이어야 함
+
+        Returns:
+            np.ndarray: 비율을 유지한 채 (width, height) 안에 들어가도록 줄인 BGR 배열 (capture 스레드가 다시 쓰지 않음)
+                        이미 크기가 맞으면 frame을 그대로 반환
+        """
+        h, w = frame.shape[:2]
+        scale = min(self.width / w, self.height / h)
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if size == (w, h):
+            return frame
+        return cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+
+def bgr_qimage(frame):
+    """
+    BGR 배열을 복사 없이 감싸는 QImage를 만드는 함수
+    QImage는 배열의 메모리를 그대로 사용하므로 배열이 살아 있는 동안만 사용해야 함.
+    """
+    h, w = frame.shape[:2]
+    return QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+
+class VideoWidget(QLabel):
+    """
+    capture 스레드가 보낸 BGR 프레임을 QPixmap으로 바꾸지 않고 바로 그리는 영상 위젯
+    프레임마다 QPixmap.fromImage + setPixmap으로 이미지를 다시 올리지 않고,
+    paintEvent에서 QImage를 그대로 그림.
+    QLabel을 상속하므로 프레임이 없을 때는 기존처럼 글자, pixmap, 스타일시트를 표시함.
+    """
+    def __init__(self, text='', parent=None):
+        super().__init__(text, parent)
+        # QImage가 가리키는 배열을 함께 들고 있어, 그리는 동안 메모리가 해제되지 않도록 함
+        self.frame = None
+        self.image = None
+
+    def set_frame(self, frame):
+        """
+        Argv:
+            frame (np.ndarray): FrameScaler로 위젯 크기에 맞춘 BGR 배열
+        """
+        if self.frame is None and (self.text() or (self.pixmap() is not None and not self.pixmap().isNull())):
+            super().clear()
+        self.frame = frame
+        self.image = bgr_qimage(frame)
+        self.update()
+
+    def clear_frame(self):
+        self.frame = None
+        self.image = None
+        self.update()
+
+    # 글자나 pixmap을 다시 표시하면 영상 프레임은 지움
+    def setText(self, text):
+        self.clear_frame()
+        super().setText(text)
+
+    def setPixmap(self, pixmap):
+        self.clear_frame()
+        super().setPixmap(pixmap)
+
+    def clear(self):
+        self.clear_frame()
+        super().clear()
+
+    def paintEvent(self, event):
+        # 스타일시트 배경과 테두리는 QLabel이 그림
+        super().paintEvent(event)
+        if self.image is None:
+            return
+        painter = QPainter(self)
+        x = (self.width() - self.image.width()) // 2
+        y = (self.height() - self.image.height()) // 2
+        painter.drawImage(x, y, self.image)
+        painter.end()
+
+class FrameMailbox(QObject):
+    """
+    capture 스레드에서 GUI 스레드로 영상마다 '가장 최근 프레임만' 전달하는 우편함
+    capture 스레드가 프레임마다 신호를 큐에 쌓으면, GUI 스레드가 잠깐 멈췄을 때
+    (스타일시트 갱신, 화면 전환 등) 밀린 프레임이 한꺼번에 늦게 그려짐.
+    우편함은 영상(feed)마다 마지막 프레임 하나만 보관하고, GUI 스레드에 깨우는 신호도
+    한 번에 하나만 보내며, frame_ready는 feed마다 최대 max_fps(모니터 주사율 이하)로만 보냄.
+    따라서 GUI가 멈춰도 밀린 프레임은 버려지고 지연과 메모리가 일정하게 유지됨.
+    """
+    # (frame, feed 번호). GUI 스레드에서 발생
+    frame_ready = pyqtSignal(object, int)
+    # capture 스레드 -> GUI 스레드로 feed 번호를 전달하는 내부 신호
+    _wakeup = pyqtSignal(int)
+
+    def __init__(self, max_fps=30, parent=None):
+        """
+        Argv:
+            max_fps (float): feed마다 frame_ready를 보내는 최대 횟수(초당). 모니터 주사율보다 높으면 주사율 사용
+        """
+        super().__init__(parent)
+        screen = QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+        if refresh_rate > 0:
+            max_fps = min(max_fps, refresh_rate)
+        self.interval = 1.0 / max_fps
+        self.lock = threading.Lock()
+        # feed 번호 -> 아직 전달하지 않은 가장 최근 프레임
+        self.latest = {}
+        # GUI 스레드에 깨우는 신호를 보냈거나 전달을 예약한 feed
+        self.pending = set()
+        # feed 번호 -> 마지막으로 frame_ready를 보낸 시각
+        self.last_delivery = {}
+        # 버려진 프레임 수 (디버깅용)
+        self.dropped = 0
+        # 내부 신호는 GUI 스레드(이 객체의 스레드)에서 처리되도록 queued로 연결됨
+        self._wakeup.connect(self._schedule)
+
+    def post(self, frame, feed_index=0):
+        """
+        프레임을 우편함에 넣는 함수 (capture 스레드에서 호출)
+        이미 전달을 기다리는 프레임이 있으면 새 프레임으로 교체만 하고 신호는 보내지 않음.
+        """
+        with self.lock:
+            if self.latest.get(feed_index) is not None:
+                self.dropped += 1
+            self.latest[feed_index] = frame
+            if feed_index in self.pending:
+                return
+            self.pending.add(feed_index)
+        self._wakeup.emit(feed_index)
+
+    def _schedule(self, feed_index):
+        # 마지막 전달 후 interval이 지나지 않았으면 남은 시간만큼 미뤄서 전달
+        elapsed = time.monotonic() - self.last_delivery.get(feed_index, 0.0)
+        if elapsed >= self.interval:
+            self._deliver(feed_index)
+        else:
+            QTimer.singleShot(int((self.interval - elapsed) * 1000), lambda: self._deliver(feed_index))
+
+    def _deliver(self, feed_index):
+        with self.lock:
+            frame = self.latest.pop(feed_index, None)
+            self.pending.discard(feed_index)
+        if frame is None:
+            return
+        self.last_delivery[feed_index] = time.monotonic()
+        self.frame_ready.emit(frame, feed_index)
+
+    def clear(self):
+        """전달하지 않은 프레임을 버립니다. (스트리밍을 멈출 때 호출)"""
+        with self.lock:
+            self.latest.clear()
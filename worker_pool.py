@@ -0,0 +1,225 @@
+from queue import Empty
+from multiprocessing import Process, Event, Queue
+from frame_buffer import LatestFrameChannel
+from vector_block import VectorBlock
+from inference_server import inference_server
+from mainmenu import flag
+
+# Game 2에서 보여줄 이모지 순위 개수
+RANK_TOP_K = 3
+
+class TargetScore:
+    """
+    플레이어 한 명의 현재 목표 이모지와, 그 이모지에 대한 유사도/최대 유사도
+    worker가 쓴 특징 벡터를 GUI 쪽에서 읽을 때 목표 이모지와 비교함.
+    목표가 바뀔 때마다 epoch 번호가 올라가며, 이전 epoch에 보낸 프레임의 결과는 비교하지 않음.
+    """
+    def __init__(self, emoji_registry):
+        self.emoji_registry = emoji_registry
+        self.last_seq = -1
+        self.set_target(None, 0)
+
+    def set_target(self, emoji_id, epoch):
+        """
+        Argv:
+            emoji_id (int): 비교할 이모지 id (EmojiRegistry). None이면 비교하지 않음 (유사도 0)
+            epoch (int): 채널의 새 epoch 번호. 이 번호가 붙은 결과만 비교함
+        """
+        self.emoji_id = emoji_id
+        self.epoch = epoch
+        self.similarity = 0.0
+        self.max_similarity = 0.0
+
+    def update(self, seq, epoch, vector):
+        """현재 epoch의 새 벡터가 도착했으면 목표 이모지와 비교해 유사도와 최대 유사도를 갱신합니다."""
+        if seq == self.last_seq or epoch != self.epoch:
+            return
+        self.last_seq = seq
+        if self.emoji_id is None:
+            return
+        try:
+            self.similarity = self.emoji_registry.similarity(vector, self.emoji_id)
+        except ValueError:
+            print("유사도 측정 실패")
+            self.similarity = 0.0
+        self.max_similarity = max(self.max_similarity, self.similarity)
+
+class InferenceWorker:
+    """
+    미리 띄워둔 inference server 프로세스 하나와 그 프로세스가 쓰는 채널/결과값 묶음
+    화면은 WorkerPool에서 이 객체를 빌려 쓰고, 게임이 끝나면 종료하지 않고 반납함.
+    worker는 프레임별 표정 특징 벡터만 만들고, 이모지와의 비교는 이 객체(GUI 쪽)에서 함.
+    """
+    def __init__(self, emoji_registry, num_players=2):
+        self.num_players = num_players
+        self.emoji_registry = emoji_registry
+        self.channels = [
+            LatestFrameChannel(flag['VIDEO_WIDTH'], flag['VIDEO_HEIGHT']) for _ in range(num_players)
+        ]
+        # 결과는 shared memory로 받으므로 GUI 스레드에서 읽어도 IPC가 발생하지 않음
+        self.results = VectorBlock(num_players)
+        self.targets = [TargetScore(emoji_registry) for _ in range(num_players)]
+        self.ready_event = Event()
+        # worker가 모델 로드에 실패했을 때 이유를 받는 큐
+        self.errors = Queue()
+        self.error = None
+        self.process = Process(
+            target=inference_server,
+            args=(self.channels, self.results, self.ready_event, self.errors),
+            daemon=True,
+        )
+        self.in_use = False
+
+    def start(self):
+        self.process.start()
+
+    def is_ready(self):
+        """모델 로드와 warm-up이 끝났는지 확인합니다."""
+        return self.ready_event.is_set()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def failure(self):
+        """
+        worker 프로세스가 모델 로드에 실패했거나 도중에 종료되었는지 확인하는 함수
+        화면은 영상 프레임마다 호출해, 죽은 worker에 프레임을 보내며 0%만 표시하지 않도록 함.
+        Returns:
+            Str: 실패 이유. 정상이면(아직 준비 중이어도) None
+        """
+        if self.error is None:
+            try:
+                self.error = self.errors.get_nowait()
+            except Empty:
+                pass
+        if self.error is None and self.process.exitcode is not None:
+            self.error = f"inference worker가 종료되었습니다. (exit code {self.process.exitcode})"
+        return self.error
+
+    def status_text(self):
+        """점수 대신 화면에 표시할 상태 문구. 정상적으로 점수를 구하고 있으면 None"""
+        if self.failure():
+            return "모델 오류"
+        if not self.is_ready():
+            return "모델 준비 중..."
+        if self.emoji_registry.references() is None:
+            return "참조값 준비 중..."
+        return None
+
+    def set_target(self, player_index, emoji_id):
+        """
+        플레이어의 목표 이모지(id, None이면 비교 안 함)를 바꾸고 유사도를 0으로 초기화합니다.
+        worker에 아무것도 보내지 않으므로 바로 반영되며, 채널의 epoch를 올려
+        바꾸기 전에 보낸 프레임은 worker가 추론하지 않거나 결과를 쓰지 않음.
+        """
+        epoch = self.channels[player_index].next_epoch()
+        self.targets[player_index].set_target(emoji_id, epoch)
+
+    def _update(self, player_index):
+        target = self.targets[player_index]
+        target.update(*self.results.latest(player_index))
+        return target
+
+    def similarity(self, player_index):
+        return self._update(player_index).similarity
+
+    def max_similarity(self, player_index):
+        """
+        목표 이모지를 정한 뒤의 최대 유사도
+        GUI는 영상 프레임마다 읽으므로 (추론은 몇 프레임에 한 번) 새 벡터를 놓치지 않음.
+        """
+        return self._update(player_index).max_similarity
+
+    def reset_scores(self):
+        """새 라운드/게임을 시작할 때 목표 이모지와 유사도 값을 초기화합니다."""
+        for player_index in range(self.num_players):
+            self.set_target(player_index, None)
+
+    def request_ranking(self, player_index, frame):
+        """
+        프레임 한 장에 대한 이모지 순위 계산을 요청하는 함수 (Game 2)
+        Returns:
+            Int: 요청한 프레임의 시퀀스 번호. ranking()의 결과와 비교하는 데 사용
+        """
+        return self.channels[player_index].put(frame)
+
+    def ranking(self, player_index, seq):
+        """
+        request_ranking으로 요청한 프레임의 특징 벡터로 이모지 순위를 구하는 함수
+        Returns:
+            List of tuple: (Emoji, 유사도 %) 리스트. 아직 결과가 없으면 None
+        """
+        result_seq, _, vector = self.results.latest(player_index)
+        if result_seq != seq:
+            return None
+        return self.emoji_registry.rank(vector, k=RANK_TOP_K)
+
+    def shutdown(self):
+        if self.process.is_alive():
+            for channel in self.channels:
+                channel.stop()
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.terminate()
+        for channel in self.channels:
+            channel.close()
+        self.results.close()
+        self.errors.close()
+
+class WorkerPool:
+    """
+    앱 실행 시 한 번 띄워 Game 1, 2, 3이 함께 쓰는 inference worker pool
+    worker는 시작하자마자 모델을 로드하고 warm-up을 하므로,
+    게임을 시작할 때 torch/mediapipe import와 모델 로드를 다시 기다리지 않음.
+    """
+    def __init__(self, emoji_registry, size=1, num_players=2):
+        """
+        Argv:
+            emoji_registry (EmojiRegistry): 앱 시작 시 만든 이모지 목록. worker가 유사도와 순위를 구할 때 사용
+        """
+        self.emoji_registry = emoji_registry
+        self.size = size
+        self.num_players = num_players
+        self.workers = []
+
+    def start(self):
+        """worker 프로세스들을 띄웁니다. (앱 시작 시 한 번 호출)"""
+        while len(self.workers) < self.size:
+            self._spawn()
+
+    def _spawn(self):
+        worker = InferenceWorker(self.emoji_registry, self.num_players)
+        worker.start()
+        self.workers.append(worker)
+        return worker
+
+    def acquire(self):
+        """
+        사용 중이 아닌 worker를 빌려주는 함수
+        모든 worker가 사용 중이면 새로 하나 띄움.
+        """
+        # 모델 로드에 실패했거나 종료된 worker는 정리하고 새로 띄움
+        for dead in [w for w in self.workers if not w.in_use and w.failure()]:
+            print(f"inference worker를 다시 띄웁니다: {dead.error}")
+            dead.shutdown()
+            self.workers.remove(dead)
+        self.start()
+        worker = next((w for w in self.workers if not w.in_use), None)
+        if worker is None:
+            worker = self._spawn()
+        worker.in_use = True
+        worker.reset_scores()
+        return worker
+
+    def release(self, worker):
+        """빌린 worker를 종료하지 않고 반납합니다."""
+        if worker is None:
+            return
+        worker.reset_scores()
+        worker.in_use = False
+
+    def shutdown(self):
+        """앱 종료 시 모든 worker를 종료하고 shared memory를 해제합니다."""
+        for worker in self.workers:
+            worker.shutdown()
+        self.workers = []